@@ -74,23 +74,26 @@ async def comprehensive_demo():
         }
     ]
     
-    for scenario in scenarios:
-        print(f"\n{scenario['title']}")
-        print("=" * 50)
-        
-        for command in scenario['commands']:
-            print(f"\n🎯 **User says:** '{command}'")
-            print("-" * 40)
+    try:
+        for scenario in scenarios:
+            print(f"\n{scenario['title']}")
+            print("=" * 50)
             
-            try:
-                response = await cli.process_command(command)
-                print("🤖 **AI Response:**")
-                print(response)
-            except Exception as e:
-                print(f"❌ Error: {e}")
-            
-            print("-" * 40)
-            await asyncio.sleep(0.5)
+            for command in scenario['commands']:
+                print(f"\n🎯 **User says:** '{command}'")
+                print("-" * 40)
+                
+                try:
+                    response = await cli.process_command(command)
+                    print("🤖 **AI Response:**")
+                    print(response)
+                except Exception as e:
+                    print(f"❌ Error: {e}")
+                
+                print("-" * 40)
+                await asyncio.sleep(0.5)
+    finally:
+        await cli.close()
     
     print("\n🎉 **Demo Complete!**")
     print("\n✨ **Key Capabilities Demonstrated:**")
@@ -32,7 +32,7 @@ class MCPServerInfo:
     run_args: List[str]
     dependencies: List[str]
     
-@dataclass
+@dataclass(slots=True)
 class AgentRequest:
     """Request structure for AI agent creation"""
     agent_type: str
@@ -410,7 +410,7 @@ class MCPServerManager:
             
             # Use the enhanced manager for robust updates
             manager = MCPConfigurationManager(str(self.base_path / "src"))
-            success = manager.update_python_config(server_info.name, server_info.language)
+            success = await manager.aupdate_python_config(server_info.name, server_info.language)
             
             if success:
                 logger.info(f"Successfully updated Python config for {server_info.name}")
@@ -443,7 +443,7 @@ class MCPServerManager:
             tree = ast.parse(content)
             
             existing_servers = []
-            for node in ast.walk(tree):
+            for node in tree.body:
                 if isinstance(node, ast.Assign):
                     for target in node.targets:
                         if isinstance(target, ast.Name) and target.id == "ServersConfig":
@@ -713,8 +713,9 @@ ServersConfig = {json.dumps(existing_servers, indent=4)}
                 logger.info(f"ℹ️ No LLM available for auto-configuration of {server_info.name}")
                 return False
             
-            # Auto-configure the MCP server
-            success = await config_agent.auto_configure_new_mcp(server_info.name)
+            # Auto-configure the MCP server (the agent's HTTP pool is closed afterwards)
+            async with config_agent:
+                success = await config_agent.auto_configure_new_mcp(server_info.name)
             
             if success:
                 logger.info(f"✅ AI auto-configuration completed successfully for {server_info.name}")
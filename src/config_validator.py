@@ -32,7 +32,7 @@ class MCPConfigValidator:
             clients_config = None
             servers_config = None
             
-            for node in ast.walk(tree):
+            for node in tree.body:
                 if isinstance(node, ast.Assign):
                     for target in node.targets:
                         if isinstance(target, ast.Name):
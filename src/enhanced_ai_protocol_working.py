@@ -4,12 +4,20 @@ Simplified version that works with Groq LLM for MCP setup commands
 """
 
 import asyncio
+import hashlib
+import importlib.util
 import os
 import json
 import logging
 import re
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+import sys
+import threading
+import time
+import types
+from functools import lru_cache
+from contextlib import aclosing
+from typing import Dict, List, Optional, Any, Tuple, Union, AsyncIterator, Callable
+from dataclasses import dataclass, replace
 from pathlib import Path
 
 # Load environment variables from .env file
@@ -19,25 +27,515 @@ try:
 except ImportError:
     pass  # Continue without dotenv if not available
 
-# Import existing protocol
-import sys
-sys.path.append(str(Path(__file__).parent))
-from ai_agent_protocol.core import AIAgentProtocol, AgentRequest
-
-# Try to import Groq
+# Import existing protocol (package-relative when imported as src.*, top-level when run from src/)
 try:
-    from langchain_groq import ChatGroq
-    from langchain_core.messages import HumanMessage, SystemMessage
-    GROQ_AVAILABLE = True
+    from .ai_agent_protocol.core import AIAgentProtocol, AgentRequest, MCPServerInfo
 except ImportError:
-    GROQ_AVAILABLE = False
+    from ai_agent_protocol.core import AIAgentProtocol, AgentRequest, MCPServerInfo
+
+# Check for Groq without importing it: LangChain is slow to import and is loaded on first use
+GROQ_AVAILABLE = all(importlib.util.find_spec(name) is not None for name in ("langchain_groq", "langchain_core"))
+if not GROQ_AVAILABLE:
     print("⚠️ Groq not available, using pattern matching")
+ChatGroq = HumanMessage = SystemMessage = None
+
+def _load_langchain() -> None:
+    """Import the LangChain Groq client and message classes into module globals"""
+    global ChatGroq, HumanMessage, SystemMessage
+    if ChatGroq is None:
+        from langchain_core.messages import HumanMessage as human_message, SystemMessage as system_message
+        from langchain_groq import ChatGroq as chat_groq
+        HumanMessage, SystemMessage = human_message, system_message
+        ChatGroq = chat_groq  # set last: a non-None ChatGroq means everything is loaded
+
+# Use orjson for faster JSON (de)serialization when available
+try:
+    import orjson
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj: Any, indent: bool = False) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None).decode()
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any, indent: bool = False) -> str:
+        return json.dumps(obj, indent=2 if indent else None)
+
+# Optional semantic tier for the LLM response cache (sentence embeddings);
+# sentence_transformers pulls in torch, so it is imported with the model in _embed_text
+SEMANTIC_CACHE_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+if SEMANTIC_CACHE_AVAILABLE:
+    import numpy as np
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
+def _read_groq_key_from_dotenv() -> Optional[str]:
+    """Read GROQ_API_KEY from the project .env file, if present"""
+    try:
+        env_path = Path(__file__).parent.parent / ".env"
+        if env_path.exists():
+            with open(env_path, 'r') as f:
+                for line in f:
+                    if line.startswith('GROQ_API_KEY'):
+                        return line.split('=')[1].strip().strip('"').strip("'")
+    except Exception as e:
+        logger.warning("Could not load .env file: %s", e)
+    return None
+
+_DOTENV_GROQ_API_KEY = _read_groq_key_from_dotenv()
+
+# Groq clients shared per (api_key, model) so processors reuse one HTTP connection pool
+_GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
+# Command parses are short JSON replies; cap generation so they cannot run away
+_GROQ_PARSE_MAX_TOKENS = 200
+_LLM_CACHE: Dict[Tuple[str, str], Any] = {}
+_LLM_CACHE_LOCK = threading.Lock()
+
+def _get_groq_llm(api_key: str, model: str = _GROQ_MODEL) -> "ChatGroq":
+    """Return the shared ChatGroq client for this key/model, creating it on first use"""
+    key = (api_key, model)
+    llm = _LLM_CACHE.get(key)
+    if llm is None:
+        with _LLM_CACHE_LOCK:
+            llm = _LLM_CACHE.get(key)
+            if llm is None:
+                _load_langchain()
+                llm = ChatGroq(
+                    groq_api_key=api_key,
+                    model_name=model,
+                    temperature=0.1,
+                    max_tokens=1024
+                )
+                _LLM_CACHE[key] = llm
+    return llm
+
+@lru_cache(maxsize=64)
+def _system_message(content: str) -> "SystemMessage":
+    """Return a shared SystemMessage for this prompt, so repeat calls skip pydantic validation"""
+    return SystemMessage(content=content)
+
+# Parsed-command cache: repeat prompts skip re-parsing (and the Groq round-trip)
+_PARSE_CACHE_MAXSIZE = 1024
+_PARSE_CACHE_TTL = 300.0  # seconds
+
+def _normalize_input(user_input: str) -> str:
+    """Lowercase and collapse whitespace so near-identical prompts share a cache key"""
+    return " ".join(user_input.lower().split())
+
+# Pattern parses at or above this confidence skip the Groq round-trip
+_LOCAL_PARSE_MIN_CONFIDENCE = 0.9
+
+# AI relevance scoring for search results (bounded to stay under Groq's RPM limit)
+_RELEVANCE_TOP_N = 5
+_RELEVANCE_CONCURRENCY = 5
+
+# Search result cache: repeat MCP searches skip GitHub and the LLM
+_SEARCH_CACHE_MAXSIZE = 256
+_SEARCH_CACHE_TTL = 300.0  # seconds
+
+# Enhanced-intent memo: exact match on the normalized service name, no TTL
+_INTENT_CACHE_MAXSIZE = 256
+
+# GitHub search: wait for the rate-limit reset only when the reported budget is nearly spent
+_GITHUB_SEARCH_TERMS = 3
+_GITHUB_HEADERS = {"Accept": "application/vnd.github+json", "User-Agent": "horix-ai"}
+_GITHUB_RATE_LIMIT_FLOOR = 2
+_GITHUB_RATE_LIMIT_MAX_WAIT = 60.0  # seconds; the search limit window is one minute
+# ETag-validated search responses kept for conditional requests (one per search URL)
+_GITHUB_ETAG_CACHE_MAXSIZE = 256
+
+# GitHub result filter: MCP marker and extra description keywords for common services.
+# Unanchored on purpose - substring hits like "mcp_server" and "monitoring" must still count.
+_MCP_RE = re.compile(r"mcp|model context protocol")
+_SERVICE_KW_RE = {
+    "docker": re.compile(r"container|docker|containerization"),
+    "email": re.compile(r"email|mail|smtp"),
+    "github": re.compile(r"git|github|repository"),
+    "monitoring": re.compile(r"monitor|observability|metrics"),
+}
+
+# LLM response cache for the _ai_* helpers: exact prompt match, then embedding similarity
+_LLM_RESPONSE_CACHE_MAXSIZE = 512
+_LLM_RESPONSE_CACHE_TTL = 1800.0  # seconds
+_SEMANTIC_CACHE_THRESHOLD = 0.92
+_LLM_STREAM_TIMEOUT = 10.0  # seconds for a whole streamed reply
+_LLM_CALL_TIMEOUT = 8.0  # seconds per blocking LLM call
+_SETUP_AI_BUDGET = 20.0  # seconds shared by all AI steps of one MCP setup (not the install itself)
+_ALTERNATIVES_FALLBACK = "Consider searching for related technologies or creating a custom MCP server for {intent}."
+_EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+_embedding_model = None
+_embedding_model_lock = threading.Lock()
+
+# Best-match selection: local embedding rerank unless MCP_SELECT_WITH_LLM asks for the Groq selector
+_SELECT_WITH_LLM = os.getenv("MCP_SELECT_WITH_LLM", "").lower() in ("1", "true", "yes")
+_SELECT_MIN_SIMILARITY = 0.35
+
+def _semantic_scope(tag: str, system: str) -> str:
+    """Semantic cache partition: replies are only reused for the same tag and system prompt"""
+    return hashlib.blake2b(f"{tag}\0{system}".encode(), digest_size=16).hexdigest()
+
+def _embed_text(text: Union[str, List[str]]) -> "np.ndarray":
+    """Embed text (or a list of texts) with the lazily loaded sentence-transformer, normalized for cosine similarity"""
+    global _embedding_model
+    if _embedding_model is None:
+        with _embedding_model_lock:
+            if _embedding_model is None:
+                from sentence_transformers import SentenceTransformer
+                _embedding_model = SentenceTransformer(_EMBEDDING_MODEL_NAME)
+    return _embedding_model.encode(text, normalize_embeddings=True)
+
+# Groq command parsing: requests arriving within the window share one LLM call
+_GROQ_BATCH_WINDOW = 0.02  # seconds
+_GROQ_BATCH_MAX_SIZE = 8
+
+_GROQ_PARSE_PROMPT = """Parse an MCP (Model Context Protocol) server management command into JSON:
+{"action": "setup|check|list|create_agent|status|search", "mcp_name": str, "agent_type": str, "confidence": 0.0-1.0}
+mcp_name is the service/technology the user needs, inferred from intent even if no MCP server is named. agent_type is "" unless an agent is being created.
+
+Examples:
+"I want to work with my PostgreSQL database" → {"action": "setup", "mcp_name": "postgres", "agent_type": "", "confidence": 0.92}
+"What servers are installed" → {"action": "status", "mcp_name": "", "agent_type": "", "confidence": 0.95}
+
+Respond with ONLY the JSON object."""
+
+_GROQ_BATCH_SUFFIX = """
+For several numbered commands, respond instead with ONLY a JSON array of one object per command, in order."""
+
+_INTENT_EXTRACT_PROMPT = """Name the MCP (Model Context Protocol) server/service the user needs, inferred from their intent.
+Examples: "I need to manage my Docker containers" → docker; "I want to track bugs in my project" → issue-tracking
+Respond with ONLY the lowercase name (single word or hyphenated), or "unknown" if unclear."""
+
+# MCP setup: one call before the GitHub search (intent + search terms), one after (select + explain)
+_SETUP_PREP_PROMPT = """You are preparing a GitHub search for MCP (Model Context Protocol) servers.
+
+Given the service/technology the user mentioned, respond with ONLY a JSON object:
+{"intent": "<what they likely need, under 8 words>", "search_terms": ["<term>", "<term>", "<term>"]}
+
+Examples:
+docker → {"intent": "docker container management and orchestration", "search_terms": ["docker mcp", "mcp docker", "docker-mcp-server"]}
+email → {"intent": "email automation and SMTP integration", "search_terms": ["email mcp", "mcp email", "email-mcp-server"]}"""
+
+_SETUP_SELECT_PROMPT = """You are selecting the best MCP server repository for the user's intent.
+
+ONLY select a repository specifically designed as an MCP server for that service (its name or description is about it).
+Reject generic MCP tools, web panels, or management interfaces. If none fits, use index -1.
+
+Respond with ONLY a JSON object:
+{"index": <0-4 or -1>, "reason": "<2-3 sentences on why it matches the user's needs, empty if -1>"}"""
+
+# System prompts for the _ai_* helpers ({placeholders} are filled with str.format)
+_SYS_RELEVANCE_SCORE = """Rate the relevance of this repository for "{search_term}" integration on a scale of 1-10.
+
+Consider:
+- Name relevance to "{search_term}"
+- Description mentioning MCP or Model Context Protocol
+- Stars and activity as quality indicators
+- Language and technology stack
+
+Respond with ONLY a number 1-10."""
+
+_SYS_FALLBACK = """The user's command wasn't clearly understood. Based on their input, provide a helpful response that:
+
+1. Acknowledges what they might be trying to do
+2. Suggests 2-3 specific commands they could try
+3. Offers to help them find what they need
+
+Be helpful and specific. Use the user's original input to understand their intent."""
+
+_SYS_SEARCH_TERMS = """Generate 3 search terms for finding MCP (Model Context Protocol) servers on GitHub.
+
+Given a service/technology name, provide exactly 3 search terms that would find relevant MCP servers.
+
+Examples:
+docker → ["docker mcp", "mcp docker", "docker-mcp-server"]
+email → ["email mcp", "mcp email", "email-mcp-server"]
+monitoring → ["monitoring mcp", "mcp monitoring", "monitoring-mcp"]
+
+Respond with a JSON array of exactly 3 search terms, no other text."""
+
+_SYS_REPO_RELEVANCE = """Determine if this GitHub repository is relevant for '{search_term}' MCP server needs.
+
+Consider:
+- Repository name and description
+- Whether it's related to MCP (Model Context Protocol)
+- If it could help with '{search_term}' integration
+- Quality indicators (stars, recent activity)
+
+Respond with only "yes" or "no"."""
+
+_SYS_SELECT_BEST = """You are selecting the best MCP server repository for "{mcp_name}" integration.
+
+CRITICAL INSTRUCTIONS:
+1. You MUST respond with ONLY a single number (0-4) or -1
+2. Do NOT include any explanatory text, descriptions, or reasoning
+3. ONLY select repositories that are specifically designed for "{mcp_name}"
+4. If NO repository is specifically for "{mcp_name}", respond with -1
+
+Selection criteria (in order of importance):
+1. Repository name contains "{mcp_name}" 
+2. Repository description mentions "{mcp_name}" integration or "{mcp_name}" MCP
+3. Repository is clearly an MCP server FOR "{mcp_name}" (not a general tool)
+4. Reject generic MCP tools, web panels, or management interfaces
+
+For "{mcp_name}", ONLY accept repositories that are:
+- Specifically designed as MCP servers for "{mcp_name}"
+- Have "{mcp_name}" in the name or are clearly "{mcp_name}"-focused
+- Are NOT general management tools or web interfaces
+
+RESPOND WITH ONLY ONE NUMBER: 0, 1, 2, 3, 4, or -1"""
+
+_SYS_ENHANCE_INTENT = """You are analyzing a user's request for MCP server setup. The user mentioned '{mcp_name}'.
+
+Based on this, provide a more specific and enhanced understanding of what they likely need.
+
+Examples:
+- "docker" → "docker container management and orchestration"
+- "email" → "email automation and SMTP integration"  
+- "monitoring" → "application performance monitoring and observability"
+- "github" → "git repository management and version control"
+- "payment" → "payment processing and financial transactions"
+
+Respond with a more descriptive phrase that captures the user's likely intent, keep it concise (under 8 words)."""
+
+_SYS_EXPLAIN_SELECTION = """Explain in 2-3 sentences why this repository is a good match for the user's '{intent}' needs.
+
+Focus on:
+- How the repository relates to their intent
+- Key features that make it suitable
+- Why it's better than alternatives
+
+Be concise and helpful."""
+
+_SYS_SUGGEST_ALTERNATIVES = """The user is looking for MCP servers related to '{intent}' but none were found on GitHub.
+
+Provide helpful suggestions for:
+1. Alternative search terms they could try
+2. Related technologies that might have MCP servers
+3. General advice for their use case
+
+Be encouraging and provide 3-4 concrete suggestions."""
+
+_SYS_ANALYZE_INSTALLED = """Analyze the installed MCP servers and provide helpful insights.
+
+Respond with ONLY a JSON object with one short, actionable string (1-2 sentences) per key:
+{"analysis": "<what the user can accomplish with these servers>", "workflows": "<potential workflows or combinations>", "missing": "<missing servers that would complement these>"}"""
+
+# Section keys of the combined installed-server insight, with the headings the status reply shows
+_SERVER_INSIGHT_SECTIONS = (("analysis", "Analysis"), ("workflows", "Workflows"), ("missing", "Missing"))
+
+_SYS_GETTING_STARTED = """The user has no MCP servers installed yet. Provide encouraging and helpful advice for getting started.
+
+Include:
+1. Popular use cases for MCP servers
+2. Easy first servers to install
+3. How to explore what's available
+
+Be encouraging and specific (3-4 sentences)."""
+
+_JSON_DECODER = json.JSONDecoder()
+_JSON_START_RE = re.compile(r"[\[{]")
+
+def _decode_json_prefix(response_text: str) -> Any:
+    """Decode the first JSON object/array in a reply, ignoring markdown fences and trailing text"""
+    match = _JSON_START_RE.search(response_text)
+    if not match:
+        raise json.JSONDecodeError("No JSON value found", response_text, 0)
+    
+    # Fast path: the payload runs up to the last closing bracket
+    end = max(response_text.rfind("}"), response_text.rfind("]"))
+    try:
+        return _json_loads(response_text[match.start():end + 1])
+    except json.JSONDecodeError:
+        return _JSON_DECODER.raw_decode(response_text, match.start())[0]
+
+def _compile_intent_dfa(patterns) -> "re.Pattern":
+    """Fold an ordered pattern table into one alternation; group ``t<i>`` marks row i"""
+    # Inside a lookahead every match is zero-width, so one row's match never consumes text that an
+    # overlapping, higher-priority row would have matched
+    return re.compile("(?=" + "|".join(f"(?P<t{i}>{pattern})" for i, pattern in enumerate(patterns)) + ")",
+                      re.IGNORECASE)
+
+def _first_intent(dfa: "re.Pattern", user_input: str) -> int:
+    """Return the index of the first table row matching anywhere in user_input, or -1"""
+    # Each position reports the first row that matches there, so the minimum over all positions
+    # is the row a one-by-one search of the table would have found
+    best = -1
+    for match in dfa.finditer(user_input):
+        index = int(match.lastgroup[1:])
+        if best == -1 or index < best:
+            best = index
+            if best == 0:
+                break
+    return best
+
+# Demo AI intent table: pattern -> (tech, default action, confidence), in priority order
+_AI_INTENT_MAP = {
+    # Technology-specific intents
+    r'\b(container|docker|podman|containerization)\b': ('docker', 'setup', 0.95),
+    r'\b(kubernetes|k8s|cluster|orchestration)\b': ('kubernetes', 'setup', 0.94),
+    r'\b(database|db|postgres|mysql|mongodb|sql|nosql)\b': ('database', 'setup', 0.92),
+    r'\b(email|mail|smtp|gmail|outlook|messaging|notification)\b': ('email', 'setup', 0.91),
+    r'\b(git|github|gitlab|version control|repository|repo)\b': ('github', 'setup', 0.93),
+    r'\b(monitor|monitoring|observability|metrics|logging|alerting)\b': ('monitoring', 'setup', 0.90),
+    r'\b(chat|slack|teams|discord|communication)\b': ('slack', 'setup', 0.89),
+    r'\b(payment|stripe|paypal|billing|checkout|transaction)\b': ('payment', 'setup', 0.88),
+    r'\b(calendar|schedule|meeting|appointment|time)\b': ('calendar', 'setup', 0.87),
+    r'\b(weather|forecast|climate|temperature)\b': ('weather', 'setup', 0.86),
+    r'\b(file|filesystem|storage|document|backup)\b': ('filesystem', 'setup', 0.85),
+    r'\b(api|rest|graphql|webhook|endpoint)\b': ('api', 'setup', 0.84),
+    r'\b(cloud|aws|azure|gcp|serverless)\b': ('cloud', 'setup', 0.83),
+    r'\b(security|auth|authentication|oauth|login)\b': ('security', 'setup', 0.82),
+    r'\b(analytics|data|dashboard|visualization|metrics)\b': ('analytics', 'setup', 0.81),
+    r'\b(machine learning|ml|ai|neural|model)\b': ('ml', 'setup', 0.80),
+    r'\b(social|twitter|facebook|linkedin|social media)\b': ('social', 'setup', 0.79),
+    r'\b(video|streaming|media|youtube|content)\b': ('media', 'setup', 0.78),
+    r'\b(crypto|bitcoin|blockchain|ethereum|defi)\b': ('crypto', 'setup', 0.77),
+    r'\b(ci|cd|pipeline|deployment|automation|devops)\b': ('cicd', 'setup', 0.76),
+    r'\b(bug|issue|tracking|ticket|jira|linear)\b': ('issue-tracking', 'setup', 0.75),
+    r'\b(search|elasticsearch|solr|indexing)\b': ('search', 'setup', 0.74),
+}
+_AI_INTENT_DFA = _compile_intent_dfa(_AI_INTENT_MAP)
+_AI_INTENTS = tuple(_AI_INTENT_MAP.values())
+
+# Intent-based action detection
+_ACTION_PATTERNS = tuple((re.compile(pattern, re.IGNORECASE), action) for pattern, action in {
+    r'\b(what|which|show|list|display|tell me)\s+(.*?)\s+(installed|available|current)\b': 'status',
+    r'\b(install|setup|add|download|get|configure)\b': 'setup',
+    r'\b(check|verify|test|validate)\s+if\b': 'check',
+    r'\b(create|make|build|generate)\s+(.*?)\s+agent\b': 'create_agent',
+    r'\b(search|find|look for|discover)\b': 'search',
+    r'\b(list|show|display)\s+(available|all)\b': 'list'
+}.items())
+
+# Status queries recognised by the demo AI parser, matched in a single scan
+_DEMO_STATUS_RE = re.compile("|".join(map(re.escape, [
+    "what servers", "what mcp", "show me what", "list installed",
+    "what's installed", "currently installed", "available servers",
+    "wht are", "what are", "show mcps", "mcps avail", "mcp avail",
+    "available mcp", "installed mcp", "current mcp"
+])), re.IGNORECASE)
+
+# Status queries recognised by the pattern parser
+_STATUS_RE = re.compile("|".join(map(re.escape, [
+    "what servers", "what mcp", "show me what", "list installed", "list my",
+    "what's installed", "which servers", "currently installed"
+])), re.IGNORECASE)
+
+# Intent-based patterns (what the user wants to do), in priority order
+_INTENT_PATTERNS = {
+    r'\b(manage|control|work with|use|integrate|connect to|setup|configure)\s+(containers?|docker|podman)\b': 'docker',
+    r'\b(kubernetes|k8s|cluster|pods?|deployments?)\b': 'kubernetes',
+    r'\b(git|repository|repo|version control|source control)\b': 'github',
+    r'\b(database|db|sql|nosql|data storage)\b': 'database',
+    r'\b(email|mail|smtp|notifications|messaging)\b': 'email',
+    r'\b(chat|communication|team|collaboration)\b': 'slack',
+    r'\b(monitor|monitoring|observability|metrics|logging|alerting)\b': 'monitoring',
+    r'\b(files?|filesystem|storage|documents?|backup)\b': 'filesystem',
+    r'\b(payment|billing|checkout|transactions?|money)\b': 'payment',
+    r'\b(calendar|schedule|meetings?|appointments?|time)\b': 'calendar',
+    r'\b(weather|forecast|climate|temperature)\b': 'weather',
+    r'\b(search|find|lookup|query|index)\b': 'search',
+    r'\b(social|social media|posts?|tweets?)\b': 'social',
+    r'\b(video|streaming|media|youtube|content)\b': 'media',
+    r'\b(security|auth|authentication|login|oauth)\b': 'security',
+    r'\b(api|rest|graphql|webhooks?|endpoints?)\b': 'api',
+    r'\b(cloud|aws|azure|gcp|serverless)\b': 'cloud',
+    r'\b(ci|cd|pipeline|deployment|automation|devops)\b': 'cicd',
+    r'\b(bug|bugs|issue|issues|tracking|tickets?)\b': 'issue-tracking',
+    r'\b(analytics|data|dashboard|visualization|metrics)\b': 'analytics',
+    r'\b(machine learning|ml|ai|neural|model)\b': 'ml',
+    r'\b(crypto|bitcoin|blockchain|ethereum|defi)\b': 'crypto'
+}
+_INTENT_DFA = _compile_intent_dfa(_INTENT_PATTERNS)
+_INTENT_SERVICES = tuple(_INTENT_PATTERNS.values())
+
+# Direct service mentions, checked in order as substrings
+_DIRECT_SERVICES = (
+    'docker', 'kubernetes', 'k8s', 'github', 'gitlab', 'slack', 'discord',
+    'email', 'gmail', 'postgres', 'mysql', 'mongodb', 'redis', 'aws', 'azure',
+    'gcp', 'jira', 'linear', 'notion', 'obsidian', 'stripe', 'paypal',
+    'twitter', 'facebook', 'linkedin', 'youtube', 'spotify', 'netflix',
+    'zoom', 'teams', 'calendar', 'weather', 'filesystem', 'monitoring'
+)
+
+# Technology/service mentions used by the pattern parser, in priority order
+_TECH_PATTERNS = {
+    r'\b(container|docker|podman)\b': 'docker',
+    r'\b(kubernetes|k8s|kubectl)\b': 'kubernetes',
+    r'\b(database|db|postgres|mysql|mongodb|redis)\b': 'database',
+    r'\b(git|github|gitlab|version control)\b': 'github',
+    r'\b(email|mail|gmail|outlook|smtp)\b': 'email',
+    r'\b(chat|slack|teams|discord|communication)\b': 'chat',
+    r'\b(cloud|aws|azure|gcp|google cloud)\b': 'cloud',
+    r'\b(api|rest|graphql|webhook)\b': 'api',
+    r'\b(file|filesystem|storage|drive)\b': 'filesystem',
+    r'\b(monitor|monitoring|observability|logs)\b': 'monitoring',
+    r'\b(ci|cd|pipeline|jenkins|github actions)\b': 'cicd',
+    r'\b(bug|error|tracking|jira|linear)\b': 'issue-tracking',
+    r'\b(calendar|schedule|time|meeting)\b': 'calendar',
+    r'\b(weather|forecast|climate)\b': 'weather',
+    r'\b(search|google|bing|elasticsearch)\b': 'search',
+    r'\b(backup|sync|synchronization)\b': 'backup',
+    r'\b(security|auth|authentication|oauth)\b': 'security',
+    r'\b(payment|stripe|paypal|billing)\b': 'payment',
+    r'\b(social|twitter|facebook|linkedin)\b': 'social',
+    r'\b(video|youtube|streaming|media)\b': 'media',
+    r'\b(crypto|bitcoin|blockchain|ethereum)\b': 'crypto',
+    r'\b(machine learning|ml|ai|tensorflow|pytorch)\b': 'ml',
+    r'\b(data|analytics|visualization|dashboard)\b': 'analytics'
+}
+_TECH_DFA = _compile_intent_dfa(_TECH_PATTERNS)
+_TECH_SERVICES = tuple(_TECH_PATTERNS.values())
+
+# Agent types suggested by the demo AI parser for create_agent requests
+_DEMO_AGENT_TYPES = {
+    "monitoring": "monitoring_agent",
+    "github": "devops_agent",
+    "filesystem": "file_manager_agent",
+    "docker": "container_agent",
+    "kubernetes": "orchestration_agent",
+    "database": "data_agent",
+    "email": "communication_agent",
+    "security": "security_agent"
+}
+
+# Default agent type per MCP server for 'create agent' requests (read-only, shared)
+_AGENT_TYPE_MAP = types.MappingProxyType({
+    "langsmith": "monitoring_agent",
+    "github": "devops_agent",
+    "filesystem": "file_manager_agent",
+    "pagerduty": "incident_management_agent"
+})
+
+# Demo fallback context keywords, matched against whole words (so "map" no longer counts as "app")
+_WORD_RE = re.compile(r"[a-z]+")
+_FALLBACK_INPUT_MAX_CHARS = 256  # intent words sit at the start; don't lowercase/scan pasted walls of text
+_APP_KW = frozenset({"app", "apps", "application", "applications", "web", "website", "websites",
+                     "site", "sites", "software"})
+_BIZ_KW = frozenset({"business", "businesses", "company", "companies", "enterprise", "team", "teams"})
+_DATA_KW = frozenset({"data", "information", "analytics", "metrics"})
+
+# Constant parts of the demo fallback reply; only the suggestion bullets vary
+_FALLBACK_HEADER = """🤖 **AI Analysis:** I understand you're looking for help, but I need a bit more context.
+
+**Based on your request, you might want to try:**
+"""
+_FALLBACK_FOOTER = """
+
+**Or describe what you want to accomplish:**
+  • "I need help with [specific technology]"
+  • "I want to integrate [service] with my project"
+  • "Help me automate [specific task]"
+
+**Current system status:**
+  • Type 'what mcp servers are installed?' to see what's available
+  • Type 'list available mcp servers' to browse options
+
+💡 **The AI understands natural language - just describe what you need!**"""
+
+@dataclass(slots=True, frozen=True)
 class MCPCommand:
     """Parsed MCP command structure"""
     action: str  # setup, check, list, create_agent, status
@@ -45,6 +543,7 @@ class MCPCommand:
     agent_type: str = ""
     confidence: float = 0.0
     raw_input: str = ""
+    fallback: bool = False  # pattern parse standing in for a failed Groq parse (never cached)
 
 class NaturalLanguageMCPProcessor:
     """Natural language processor for MCP commands"""
@@ -52,6 +551,26 @@ class NaturalLanguageMCPProcessor:
     def __init__(self, base_path: str, groq_api_key: str = None):
         self.base_path = Path(base_path)
         self.protocol = AIAgentProtocol(str(base_path))
+        self._parse_cache: Dict[str, Tuple[float, MCPCommand]] = {}
+        self._search_cache: Dict[str, Tuple[float, str]] = {}
+        self._llm_cache: Dict[str, Tuple[float, str]] = {}
+        self._intent_cache: Dict[str, str] = {}  # normalized mcp_name -> enhanced intent
+        self._intent_inflight: Dict[str, asyncio.Task] = {}  # concurrent misses share one LLM call
+        self._llm_embed_cache: List[Tuple[float, str, Any, str]] = []  # (timestamp, scope, embedding, reply)
+        self._gh_etag: Dict[str, Tuple[str, List[Dict]]] = {}  # url -> (ETag, items) for conditional requests
+        self._gh_budget: Optional[Tuple[int, int]] = None  # (X-RateLimit-Remaining, X-RateLimit-Reset) from GitHub
+        # Long-lived HTTP session (created lazily on the running loop) so GitHub connections stay warm
+        self._http_session = None
+        self._http_session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._dir_cache: Dict[Path, Tuple[int, List[str]]] = {}  # servers dir -> (st_mtime_ns, names)
+        # Optional streaming callback: receives explanation/suggestion text as it is generated
+        self.on_token: Optional[Callable[[str], None]] = None
+        
+        # Groq micro-batching state (worker is started lazily on the running loop)
+        self._batch_queue: Optional[asyncio.Queue] = None
+        self._batch_task: Optional[asyncio.Task] = None
+        self._batch_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._batch_inflight: set = set()
         
         # Load API key from multiple sources
         if groq_api_key == "demo_mode":
@@ -59,20 +578,8 @@ class NaturalLanguageMCPProcessor:
         elif groq_api_key:
             self.groq_api_key = groq_api_key
         else:
-            # Try to load from environment or .env file
-            self.groq_api_key = os.getenv("GROQ_API_KEY")
-            if not self.groq_api_key:
-                try:
-                    # Try to load from .env file
-                    env_path = Path(__file__).parent.parent / ".env"
-                    if env_path.exists():
-                        with open(env_path, 'r') as f:
-                            for line in f:
-                                if line.startswith('GROQ_API_KEY'):
-                                    self.groq_api_key = line.split('=')[1].strip().strip('"').strip("'")
-                                    break
-                except Exception as e:
-                    logger.warning(f"Could not load .env file: {e}")
+            # Try to load from environment or .env file (scanned once at import)
+            self.groq_api_key = os.getenv("GROQ_API_KEY") or _DOTENV_GROQ_API_KEY
         
         # Force demo mode if explicitly requested
         if self.groq_api_key == "demo_mode":
@@ -81,18 +588,17 @@ class NaturalLanguageMCPProcessor:
         # Initialize Groq if available and valid key provided
         elif GROQ_AVAILABLE and self.groq_api_key and self.groq_api_key != "dummy_key":
             try:
-                # Create the Groq client
-                self.llm = ChatGroq(
-                    groq_api_key=self.groq_api_key,
-                    model_name="llama3-8b-8192",  # Updated to current supported model
-                    temperature=0.1,
-                    max_tokens=1024
-                )
+                # Reuse the process-wide Groq client for this key
+                self.llm = _get_groq_llm(self.groq_api_key)
+                # Static system prompts are built once and reused on every call
+                self._parse_system_message = _system_message(_GROQ_PARSE_PROMPT)
+                self._batch_parse_system_message = _system_message(_GROQ_PARSE_PROMPT + _GROQ_BATCH_SUFFIX)
+                self._intent_system_message = _system_message(_INTENT_EXTRACT_PROMPT)
                 self.mode = "groq"
                 logger.info("✅ Groq LLM initialized (will validate on first use)")
                     
             except Exception as e:
-                logger.warning(f"Groq setup failed: {e}")
+                logger.warning("Groq setup failed: %s", e)
                 logger.info("🔧 Falling back to demo AI mode")
                 self.mode = "demo_ai"
         else:
@@ -102,190 +608,226 @@ class NaturalLanguageMCPProcessor:
     async def process_command(self, user_input: str) -> str:
         """Process natural language command"""
         try:
-            logger.info(f"🤖 Processing: {user_input}")
+            logger.info("🤖 Processing: %s", user_input)
+            
+            # Reuse a recent parse of the same (normalized) command
+            normalized = _normalize_input(user_input)
+            command = self._get_cached_command(normalized, user_input)
             
             # Parse the command
-            if self.mode == "groq":
-                command = await self._parse_with_groq(user_input)
-            elif self.mode == "demo_ai":
-                command = await self._parse_with_demo_ai(user_input)
-            else:
-                command = self._parse_with_patterns(user_input)
+            if command is None:
+                if self.mode == "groq":
+                    # Only escalate to the LLM when the local parse is not confident
+                    command = await self._parse_with_patterns(user_input, use_ai=False, normalized=normalized)
+                    if not self._is_confident_local_parse(command):
+                        command = await self._parse_with_groq(user_input)
+                elif self.mode == "demo_ai":
+                    command = await self._parse_with_demo_ai(user_input, normalized)
+                else:
+                    command = await self._parse_with_patterns(user_input, normalized=normalized)
+                # A fallback parse is not cached, so the input gets a real Groq parse once Groq recovers
+                if not command.fallback:
+                    self._store_cached_command(normalized, command)
             
             # Execute the command
             return await self._execute_command(command)
             
         except Exception as e:
-            logger.error(f"Error processing command: {e}")
+            logger.error("Error processing command: %s", e)
             return f"❌ Error: {e}\n💡 Try commands like 'setup github mcp server'"
     
+    def _is_confident_local_parse(self, command: MCPCommand) -> bool:
+        """Whether a pattern parse is reliable enough to skip the Groq round-trip"""
+        return (command.confidence >= _LOCAL_PARSE_MIN_CONFIDENCE and command.action != "unknown"
+                and bool(command.mcp_name or command.action == "status"))
+    
+    def _get_cached_command(self, normalized: str, user_input: str) -> Optional[MCPCommand]:
+        """Return a cached parse for this input if it has not expired"""
+        cached = self._parse_cache.get(normalized)
+        if cached is None:
+            return None
+        
+        timestamp, command = cached
+        if time.monotonic() - timestamp >= _PARSE_CACHE_TTL:
+            del self._parse_cache[normalized]
+            return None
+        
+        logger.info("⚡ Parse cache hit: %s", normalized)
+        return replace(command, raw_input=user_input)
+    
+    def _store_cached_command(self, normalized: str, command: MCPCommand):
+        """Cache a parsed command, evicting the oldest entry when full"""
+        if len(self._parse_cache) >= _PARSE_CACHE_MAXSIZE:
+            del self._parse_cache[next(iter(self._parse_cache))]
+        self._parse_cache[normalized] = (time.monotonic(), command)
+    
     async def _parse_with_groq(self, user_input: str) -> MCPCommand:
+        """Parse command using Groq LLM, batching concurrent requests into one call"""
+        queue = self._ensure_groq_batcher()
+        future = asyncio.get_running_loop().create_future()
+        await queue.put((user_input, future))
+        return await future
+    
+    def _ensure_groq_batcher(self) -> asyncio.Queue:
+        """Start (or restart on a new event loop) the background Groq batch worker"""
+        loop = asyncio.get_running_loop()
+        if self._batch_task is None or self._batch_task.done() or self._batch_loop is not loop:
+            self._batch_queue = asyncio.Queue()
+            self._batch_loop = loop
+            self._batch_task = loop.create_task(self._groq_batch_worker())
+        return self._batch_queue
+    
+    async def _groq_batch_worker(self):
+        """Collect parse requests arriving within a short window and dispatch them together"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._batch_queue.get()]
+            deadline = loop.time() + _GROQ_BATCH_WINDOW
+            while len(batch) < _GROQ_BATCH_MAX_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._batch_queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Dispatch without blocking collection of the next batch
+            task = loop.create_task(self._dispatch_groq_batch(batch))
+            self._batch_inflight.add(task)
+            task.add_done_callback(self._batch_inflight.discard)
+    
+    async def _dispatch_groq_batch(self, batch: List[Tuple[str, asyncio.Future]]):
+        """Parse a batch of inputs and resolve each caller's future"""
+        inputs = [user_input for user_input, _ in batch]
+        try:
+            if len(inputs) == 1:
+                commands = [await self._parse_single_with_groq(inputs[0])]
+            else:
+                commands = await self._parse_batch_with_groq(inputs)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, future), command in zip(batch, commands):
+            if not future.done():
+                future.set_result(command)
+    
+    async def _parse_batch_with_groq(self, inputs: List[str]) -> List[MCPCommand]:
+        """Parse several commands with one Groq request, falling back to per-command calls"""
+        try:
+            numbered = "\n".join(f"{i}. {user_input}" for i, user_input in enumerate(inputs, 1))
+            messages = [
+                self._batch_parse_system_message,
+                HumanMessage(content=numbered)
+            ]
+            
+            parsed_list = await self._stream_llm_json(messages, _GROQ_PARSE_MAX_TOKENS * len(inputs))
+            
+            if not isinstance(parsed_list, list) or len(parsed_list) != len(inputs) or \
+                    not all(isinstance(parsed, dict) for parsed in parsed_list):
+                raise ValueError(f"expected a JSON array of {len(inputs)} objects")
+            
+            logger.info("🤖 Groq parsed %s commands in one request", len(inputs))
+            return list(await asyncio.gather(*(self._command_from_groq_json(parsed, user_input)
+                                               for parsed, user_input in zip(parsed_list, inputs))))
+            
+        except Exception as e:
+            logger.warning("Batched Groq parsing failed, parsing individually: %s", e)
+            return list(await asyncio.gather(*(self._parse_single_with_groq(user_input) for user_input in inputs)))
+    
+    async def _parse_single_with_groq(self, user_input: str) -> MCPCommand:
         """Parse command using Groq LLM with enhanced MCP detection"""
         try:
-            system_prompt = """You are an expert at parsing natural language commands for MCP (Model Context Protocol) server management.
-
-Parse the user's command and respond with ONLY a JSON object with these fields:
-- action: one of "setup", "check", "list", "create_agent", "status", "search"
-- mcp_name: the MCP server/service type needed (extract from user intent, not just exact matches)
-- agent_type: type of agent to create or empty string
-- confidence: confidence score 0.0-1.0
-- purpose: brief description of what the user wants to accomplish
-
-You should understand user intent even if they don't mention exact MCP server names.
-
-Examples:
-"setup github mcp server" → {"action": "setup", "mcp_name": "github", "agent_type": "", "confidence": 0.95, "purpose": "setup github integration"}
-
-"I need to manage my Docker containers" → {"action": "setup", "mcp_name": "docker", "agent_type": "", "confidence": 0.90, "purpose": "container management"}
-
-"Help me monitor my application performance" → {"action": "setup", "mcp_name": "monitoring", "agent_type": "monitoring_agent", "confidence": 0.88, "purpose": "application monitoring"}
-
-"I want to work with my PostgreSQL database" → {"action": "setup", "mcp_name": "postgres", "agent_type": "", "confidence": 0.92, "purpose": "database integration"}
-
-"Set up email automation for my business" → {"action": "setup", "mcp_name": "email", "agent_type": "", "confidence": 0.89, "purpose": "email automation"}
-
-"What servers are installed" → {"action": "status", "mcp_name": "", "agent_type": "", "confidence": 0.95, "purpose": "check installed servers"}
-
-"Find MCP servers for payment processing" → {"action": "search", "mcp_name": "payment", "agent_type": "", "confidence": 0.87, "purpose": "payment integration"}
-
-"Create a monitoring agent" → {"action": "create_agent", "mcp_name": "monitoring", "agent_type": "monitoring_agent", "confidence": 0.93, "purpose": "create monitoring agent"}
-
-Extract the core service/technology the user needs, even if not explicitly mentioned as "MCP server".
-
-Respond with ONLY the JSON object, no other text."""
-
             messages = [
-                SystemMessage(content=system_prompt),
+                self._parse_system_message,
                 HumanMessage(content=user_input)
             ]
             
-            response = await self.llm.ainvoke(messages)
-            response_text = response.content.strip()
-            
-            # Try to extract JSON from response
+            # Stream the reply and stop as soon as the JSON object is complete
             try:
-                # Remove any markdown formatting
-                if "```json" in response_text:
-                    response_text = response_text.split("```json")[1].split("```")[0]
-                elif "```" in response_text:
-                    response_text = response_text.split("```")[1].split("```")[0]
-                
-                parsed = json.loads(response_text)
-                
-                # If no MCP name detected by AI, try our enhanced extraction
-                if not parsed.get("mcp_name"):
-                    extracted_intent = self._extract_mcp_intent_from_prompt(user_input)
-                    if extracted_intent:
-                        parsed["mcp_name"] = extracted_intent
-                        parsed["confidence"] = max(0.7, parsed.get("confidence", 0.5))
-                
-                logger.info(f"🤖 Groq parsed command: {parsed}")
-                
-                return MCPCommand(
-                    action=parsed.get("action", "unknown"),
-                    mcp_name=parsed.get("mcp_name", ""),
-                    agent_type=parsed.get("agent_type", ""),
-                    confidence=parsed.get("confidence", 0.5),
-                    raw_input=user_input
-                )
+                parsed = await self._stream_llm_json(messages, _GROQ_PARSE_MAX_TOKENS)
+                return await self._command_from_groq_json(parsed, user_input)
                 
-            except json.JSONDecodeError:
-                logger.warning(f"Failed to parse Groq response as JSON: {response_text}")
+            except json.JSONDecodeError as e:
+                logger.warning("Failed to parse Groq response as JSON: %s", e.doc)
                 # Fallback to pattern matching
-                return self._parse_with_patterns(user_input)
+                return replace(await self._parse_with_patterns(user_input), fallback=True)
                 
         except Exception as e:
-            logger.error(f"Groq parsing failed: {e}")
+            logger.error("Groq parsing failed: %s", e)
             # Fallback to pattern matching
-            return self._parse_with_patterns(user_input)
+            return replace(await self._parse_with_patterns(user_input), fallback=True)
     
-    async def _parse_with_demo_ai(self, user_input: str) -> MCPCommand:
+    async def _stream_llm_json(self, messages, max_tokens: int) -> Any:
+        """Stream an LLM reply, returning as soon as a complete JSON value has arrived"""
+        buffer = ""
+        async with asyncio.timeout(_LLM_CALL_TIMEOUT), aclosing(self.llm.astream(messages, max_tokens=max_tokens)) as stream:
+            async for chunk in stream:
+                buffer += chunk.content
+                # Only a closing bracket can complete a JSON object/array
+                if "}" in chunk.content or "]" in chunk.content:
+                    try:
+                        return _decode_json_prefix(buffer)
+                    except json.JSONDecodeError:
+                        continue
+        
+        return _decode_json_prefix(buffer)
+    
+    async def _command_from_groq_json(self, parsed: Dict[str, Any], user_input: str) -> MCPCommand:
+        """Build an MCPCommand from one parsed Groq JSON object"""
+        # If no MCP name detected by AI, try our enhanced extraction
+        if not parsed.get("mcp_name"):
+            extracted_intent = await self._extract_mcp_intent_from_prompt(user_input)
+            if extracted_intent:
+                parsed["mcp_name"] = extracted_intent
+                parsed["confidence"] = max(0.7, parsed.get("confidence", 0.5))
+        
+        logger.info("🤖 Groq parsed command: %s", parsed)
+        
+        return MCPCommand(
+            action=parsed.get("action", "unknown"),
+            mcp_name=parsed.get("mcp_name", ""),
+            agent_type=parsed.get("agent_type", ""),
+            confidence=parsed.get("confidence", 0.5),
+            raw_input=user_input
+        )
+    
+    async def _parse_with_demo_ai(self, user_input: str, normalized: Optional[str] = None) -> MCPCommand:
         """Parse command using simulated AI understanding (no API key needed)"""
-        user_input_lower = user_input.lower().strip()
-        
-        # Advanced AI-like intent recognition patterns
-        ai_intent_map = {
-            # Technology-specific intents
-            r'\b(container|docker|podman|containerization)\b': ('docker', 'setup', 0.95),
-            r'\b(kubernetes|k8s|cluster|orchestration)\b': ('kubernetes', 'setup', 0.94),
-            r'\b(database|db|postgres|mysql|mongodb|sql|nosql)\b': ('database', 'setup', 0.92),
-            r'\b(email|mail|smtp|gmail|outlook|messaging|notification)\b': ('email', 'setup', 0.91),
-            r'\b(git|github|gitlab|version control|repository|repo)\b': ('github', 'setup', 0.93),
-            r'\b(monitor|monitoring|observability|metrics|logging|alerting)\b': ('monitoring', 'setup', 0.90),
-            r'\b(chat|slack|teams|discord|communication)\b': ('slack', 'setup', 0.89),
-            r'\b(payment|stripe|paypal|billing|checkout|transaction)\b': ('payment', 'setup', 0.88),
-            r'\b(calendar|schedule|meeting|appointment|time)\b': ('calendar', 'setup', 0.87),
-            r'\b(weather|forecast|climate|temperature)\b': ('weather', 'setup', 0.86),
-            r'\b(file|filesystem|storage|document|backup)\b': ('filesystem', 'setup', 0.85),
-            r'\b(api|rest|graphql|webhook|endpoint)\b': ('api', 'setup', 0.84),
-            r'\b(cloud|aws|azure|gcp|serverless)\b': ('cloud', 'setup', 0.83),
-            r'\b(security|auth|authentication|oauth|login)\b': ('security', 'setup', 0.82),
-            r'\b(analytics|data|dashboard|visualization|metrics)\b': ('analytics', 'setup', 0.81),
-            r'\b(machine learning|ml|ai|neural|model)\b': ('ml', 'setup', 0.80),
-            r'\b(social|twitter|facebook|linkedin|social media)\b': ('social', 'setup', 0.79),
-            r'\b(video|streaming|media|youtube|content)\b': ('media', 'setup', 0.78),
-            r'\b(crypto|bitcoin|blockchain|ethereum|defi)\b': ('crypto', 'setup', 0.77),
-            r'\b(ci|cd|pipeline|deployment|automation|devops)\b': ('cicd', 'setup', 0.76),
-            r'\b(bug|issue|tracking|ticket|jira|linear)\b': ('issue-tracking', 'setup', 0.75),
-            r'\b(search|elasticsearch|solr|indexing)\b': ('search', 'setup', 0.74),
-        }
-        
-        # Intent-based action detection
-        action_patterns = {
-            r'\b(what|which|show|list|display|tell me)\s+(.*?)\s+(installed|available|current)\b': 'status',
-            r'\b(install|setup|add|download|get|configure)\b': 'setup',
-            r'\b(check|verify|test|validate)\s+if\b': 'check',
-            r'\b(create|make|build|generate)\s+(.*?)\s+agent\b': 'create_agent',
-            r'\b(search|find|look for|discover)\b': 'search',
-            r'\b(list|show|display)\s+(available|all)\b': 'list'
-        }
+        if normalized is None:
+            normalized = _normalize_input(user_input)
         
         # AI-like understanding: extract technology and action
         detected_tech = ""
         detected_action = "setup"  # Default to setup for most requests
         confidence = 0.7
         
-        # First, detect technology/service intent
-        for pattern, (tech, default_action, conf) in ai_intent_map.items():
-            if re.search(pattern, user_input_lower):
-                detected_tech = tech
-                detected_action = default_action
-                confidence = conf
-                break
+        # First, detect technology/service intent (one scan over the combined table)
+        intent_index = _first_intent(_AI_INTENT_DFA, normalized)
+        if intent_index >= 0:
+            detected_tech, detected_action, confidence = _AI_INTENTS[intent_index]
         
         # Then, refine the action based on explicit action words
-        for pattern, action in action_patterns.items():
-            if re.search(pattern, user_input_lower):
+        for pattern, action in _ACTION_PATTERNS:
+            if pattern.search(normalized):
                 detected_action = action
                 confidence = min(0.95, confidence + 0.1)
                 break
         
         # Special handling for status queries (improved detection)
-        if any(phrase in user_input_lower for phrase in [
-            "what servers", "what mcp", "show me what", "list installed", 
-            "what's installed", "currently installed", "available servers",
-            "wht are", "what are", "show mcps", "mcps avail", "mcp avail",
-            "available mcp", "installed mcp", "current mcp"
-        ]):
+        if _DEMO_STATUS_RE.search(normalized):
             detected_action = "status"
             confidence = 0.95
         
         # Agent type determination for create_agent actions
         agent_type = ""
         if detected_action == "create_agent":
-            agent_type_map = {
-                "monitoring": "monitoring_agent",
-                "github": "devops_agent", 
-                "filesystem": "file_manager_agent",
-                "docker": "container_agent",
-                "kubernetes": "orchestration_agent",
-                "database": "data_agent",
-                "email": "communication_agent",
-                "security": "security_agent"
-            }
-            agent_type = agent_type_map.get(detected_tech, "custom_agent")
+            agent_type = _DEMO_AGENT_TYPES.get(detected_tech, "custom_agent")
         
-        logger.info(f"🧪 Demo AI parsed: tech='{detected_tech}', action='{detected_action}', confidence={confidence}")
+        logger.info("🧪 Demo AI parsed: tech='%s', action='%s', confidence=%s", detected_tech, detected_action, confidence)
         
         return MCPCommand(
             action=detected_action,
@@ -295,53 +837,30 @@ Respond with ONLY the JSON object, no other text."""
             raw_input=user_input
         )
     
-    def _parse_with_patterns(self, user_input: str) -> MCPCommand:
-        """Parse command using AI-enhanced pattern matching"""
-        user_input_lower = user_input.lower().strip()
+    async def _parse_with_patterns(self, user_input: str, use_ai: bool = True,
+                                   normalized: Optional[str] = None) -> MCPCommand:
+        """Parse command using AI-enhanced pattern matching (use_ai=False never calls the LLM)"""
+        user_input_lower = normalized if normalized is not None else _normalize_input(user_input)
         
         # Use AI to extract MCP information from any user prompt
-        mcp_name = self._extract_mcp_intent_from_prompt(user_input)
+        if use_ai:
+            mcp_name = await self._extract_mcp_intent_from_prompt(user_input, user_input_lower)
+        else:
+            mcp_name = self._pattern_extract_mcp_intent(user_input, user_input_lower)
         
         # If no specific MCP detected, try to infer from context
         if not mcp_name:
             # Look for technology/service mentions that could be MCP servers
-            tech_patterns = {
-                r'\b(container|docker|podman)\b': 'docker',
-                r'\b(kubernetes|k8s|kubectl)\b': 'kubernetes', 
-                r'\b(database|db|postgres|mysql|mongodb|redis)\b': 'database',
-                r'\b(git|github|gitlab|version control)\b': 'github',
-                r'\b(email|mail|gmail|outlook|smtp)\b': 'email',
-                r'\b(chat|slack|teams|discord|communication)\b': 'chat',
-                r'\b(cloud|aws|azure|gcp|google cloud)\b': 'cloud',
-                r'\b(api|rest|graphql|webhook)\b': 'api',
-                r'\b(file|filesystem|storage|drive)\b': 'filesystem',
-                r'\b(monitor|monitoring|observability|logs)\b': 'monitoring',
-                r'\b(ci|cd|pipeline|jenkins|github actions)\b': 'cicd',
-                r'\b(bug|error|tracking|jira|linear)\b': 'issue-tracking',
-                r'\b(calendar|schedule|time|meeting)\b': 'calendar',
-                r'\b(weather|forecast|climate)\b': 'weather',
-                r'\b(search|google|bing|elasticsearch)\b': 'search',
-                r'\b(backup|sync|synchronization)\b': 'backup',
-                r'\b(security|auth|authentication|oauth)\b': 'security',
-                r'\b(payment|stripe|paypal|billing)\b': 'payment',
-                r'\b(social|twitter|facebook|linkedin)\b': 'social',
-                r'\b(video|youtube|streaming|media)\b': 'media',
-                r'\b(crypto|bitcoin|blockchain|ethereum)\b': 'crypto',
-                r'\b(machine learning|ml|ai|tensorflow|pytorch)\b': 'ml',
-                r'\b(data|analytics|visualization|dashboard)\b': 'analytics'
-            }
-            
-            for pattern, service in tech_patterns.items():
-                if re.search(pattern, user_input_lower):
-                    mcp_name = service
-                    break
+            tech_index = _first_intent(_TECH_DFA, user_input_lower)
+            if tech_index >= 0:
+                mcp_name = _TECH_SERVICES[tech_index]
         
         # Determine action with better logic
         action = "unknown"
         confidence = 0.7
         
         # Check for status/list queries first (regardless of MCP name presence)
-        if any(phrase in user_input_lower for phrase in ["what servers", "what mcp", "show me what", "list installed", "list my", "what's installed", "which servers", "currently installed"]):
+        if _STATUS_RE.search(user_input_lower):
             action = "status"
             confidence = 0.9
         elif any(word in user_input_lower for word in ["setup", "install", "download", "add"]) and mcp_name:
@@ -380,112 +899,52 @@ Respond with ONLY the JSON object, no other text."""
             raw_input=user_input
         )
     
-    def _extract_mcp_intent_from_prompt(self, user_input: str) -> str:
+    async def _extract_mcp_intent_from_prompt(self, user_input: str, normalized: Optional[str] = None) -> str:
         """Use AI to extract MCP server intent from any user prompt"""
         try:
             if self.mode == "groq" and hasattr(self, 'llm'):
                 # Use Groq LLM to understand the intent
-                return self._ai_extract_mcp_intent(user_input)
+                return await self._ai_extract_mcp_intent(user_input)
             else:
                 # Fallback to enhanced pattern matching
-                return self._pattern_extract_mcp_intent(user_input)
+                return self._pattern_extract_mcp_intent(user_input, normalized)
         except Exception as e:
-            logger.warning(f"Error extracting MCP intent: {e}")
+            logger.warning("Error extracting MCP intent: %s", e)
             return ""
     
-    def _ai_extract_mcp_intent(self, user_input: str) -> str:
+    async def _ai_extract_mcp_intent(self, user_input: str) -> str:
         """Use Groq AI to extract MCP server intent from user prompt"""
         try:
-            system_prompt = """You are an expert at understanding user intentions for MCP (Model Context Protocol) server needs.
-
-Analyze the user's request and determine what type of MCP server or service they need based on their description. 
-
-Examples:
-- "I need to manage my Docker containers" → "docker"
-- "Help me track my GitHub repositories" → "github" 
-- "I want to monitor my application performance" → "monitoring"
-- "Set up email automation for my business" → "email"
-- "I need to work with my PostgreSQL database" → "postgres"
-- "Help me manage my Kubernetes cluster" → "kubernetes"
-- "I want to integrate with Slack for notifications" → "slack"
-- "Need to backup my files to cloud storage" → "backup"
-- "I want to track bugs and issues in my project" → "issue-tracking"
-- "Help me schedule meetings and manage calendar" → "calendar"
-- "I need to process payments for my application" → "payment"
-- "Want to analyze data and create dashboards" → "analytics"
-- "I need machine learning capabilities" → "ml"
-- "Help me with CI/CD pipeline automation" → "cicd"
-
-Respond with ONLY the service/technology name (lowercase, single word or hyphenated), or "unknown" if unclear.
-
-Examples of good responses: docker, github, email, postgres, kubernetes, slack, monitoring, analytics, ml, cicd, backup, calendar, payment, issue-tracking, filesystem, weather, social, media, crypto, security, api, cloud, search"""
-
             messages = [
-                SystemMessage(content=system_prompt),
+                self._intent_system_message,
                 HumanMessage(content=f"User request: {user_input}")
             ]
             
-            response = self.llm.invoke(messages)
-            intent = response.content.strip().lower()
+            reply = await self._llm_call(messages, max_tokens=_GROQ_PARSE_MAX_TOKENS)
+            intent = reply.strip().lower()
             
             # Validate the response
             if intent and intent != "unknown" and len(intent) < 30:
-                logger.info(f"🤖 AI extracted MCP intent: '{intent}' from '{user_input}'")
+                logger.info("🤖 AI extracted MCP intent: '%s' from '%s'", intent, user_input)
                 return intent
             
         except Exception as e:
-            logger.error(f"AI intent extraction failed: {e}")
+            logger.error("AI intent extraction failed: %s", e)
         
         return ""
     
-    def _pattern_extract_mcp_intent(self, user_input: str) -> str:
+    def _pattern_extract_mcp_intent(self, user_input: str, normalized: Optional[str] = None) -> str:
         """Enhanced pattern-based MCP intent extraction"""
-        user_input_lower = user_input.lower()
+        user_input_lower = normalized if normalized is not None else _normalize_input(user_input)
         
         # Direct service mentions
-        direct_services = {
-            'docker', 'kubernetes', 'k8s', 'github', 'gitlab', 'slack', 'discord',
-            'email', 'gmail', 'postgres', 'mysql', 'mongodb', 'redis', 'aws', 'azure',
-            'gcp', 'jira', 'linear', 'notion', 'obsidian', 'stripe', 'paypal',
-            'twitter', 'facebook', 'linkedin', 'youtube', 'spotify', 'netflix',
-            'zoom', 'teams', 'calendar', 'weather', 'filesystem', 'monitoring'
-        }
-        
-        for service in direct_services:
+        for service in _DIRECT_SERVICES:
             if service in user_input_lower:
                 return service
         
         # Intent-based patterns (what the user wants to do)
-        intent_patterns = {
-            r'\b(manage|control|work with|use|integrate|connect to|setup|configure)\s+(containers?|docker|podman)\b': 'docker',
-            r'\b(kubernetes|k8s|cluster|pods?|deployments?)\b': 'kubernetes',
-            r'\b(git|repository|repo|version control|source control)\b': 'github',
-            r'\b(database|db|sql|nosql|data storage)\b': 'database',
-            r'\b(email|mail|smtp|notifications|messaging)\b': 'email',
-            r'\b(chat|communication|team|collaboration)\b': 'slack',
-            r'\b(monitor|monitoring|observability|metrics|logging|alerting)\b': 'monitoring',
-            r'\b(files?|filesystem|storage|documents?|backup)\b': 'filesystem',
-            r'\b(payment|billing|checkout|transactions?|money)\b': 'payment',
-            r'\b(calendar|schedule|meetings?|appointments?|time)\b': 'calendar',
-            r'\b(weather|forecast|climate|temperature)\b': 'weather',
-            r'\b(search|find|lookup|query|index)\b': 'search',
-            r'\b(social|social media|posts?|tweets?)\b': 'social',
-            r'\b(video|streaming|media|youtube|content)\b': 'media',
-            r'\b(security|auth|authentication|login|oauth)\b': 'security',
-            r'\b(api|rest|graphql|webhooks?|endpoints?)\b': 'api',
-            r'\b(cloud|aws|azure|gcp|serverless)\b': 'cloud',
-            r'\b(ci|cd|pipeline|deployment|automation|devops)\b': 'cicd',
-            r'\b(bug|bugs|issue|issues|tracking|tickets?)\b': 'issue-tracking',
-            r'\b(analytics|data|dashboard|visualization|metrics)\b': 'analytics',
-            r'\b(machine learning|ml|ai|neural|model)\b': 'ml',
-            r'\b(crypto|bitcoin|blockchain|ethereum|defi)\b': 'crypto'
-        }
-        
-        for pattern, service in intent_patterns.items():
-            if re.search(pattern, user_input_lower):
-                return service
-        
-        return ""
+        intent_index = _first_intent(_INTENT_DFA, user_input_lower)
+        return _INTENT_SERVICES[intent_index] if intent_index >= 0 else ""
     
     async def _execute_command(self, command: MCPCommand) -> str:
         """Execute the parsed command with AI-enhanced routing"""
@@ -514,6 +973,14 @@ Examples of good responses: docker, github, email, postgres, kubernetes, slack,
         if not search_term:
             return "❌ Please specify what to search for\n💡 Example: 'search for payment MCP servers'"
         
+        # Repeat searches within the TTL skip GitHub and the LLM entirely
+        now = time.monotonic()
+        hit = self._search_cache.pop(search_term, None)
+        if hit is not None and now - hit[0] < _SEARCH_CACHE_TTL:
+            self._search_cache[search_term] = hit  # re-insert as most recently used
+            logger.info("⚡ Search cache hit: %s", search_term)
+            return hit[1]
+        
         try:
             # Generate search terms using AI
             search_terms = await self._generate_search_terms_for_mcp(search_term)
@@ -532,30 +999,151 @@ Examples of good responses: docker, github, email, postgres, kubernetes, slack,
             # Use AI to categorize and present results
             categorized = await self._ai_categorize_search_results(search_term, github_results)
             
-            result = f"🔍 **AI-Discovered MCP Servers for '{search_term}'** ({len(github_results)} found):\n\n"
+            top_results = github_results[:_RELEVANCE_TOP_N]
             
-            for i, repo in enumerate(github_results[:5], 1):
-                result += f"**{i}. {repo['name']}** ⭐ {repo.get('stargazers_count', 0)}\n"
-                result += f"   📝 {repo.get('description', 'No description')}\n"
-                result += f"   💻 Language: {repo.get('language', 'Unknown')}\n"
-                result += f"   🔗 {repo['html_url']}\n"
+            # Score all top results concurrently: same API spend as sequential, one round-trip of latency
+            relevance_scores = [None] * len(top_results)
+            if hasattr(self, 'llm') and self.mode == "groq":
+                semaphore = asyncio.Semaphore(_RELEVANCE_CONCURRENCY)
                 
-                # Only add AI relevance for the top result to save API calls
-                if hasattr(self, 'llm') and self.mode == "groq" and i == 1:
-                    try:
-                        relevance = await self._ai_calculate_relevance(search_term, repo)
-                        result += f"   🤖 AI Relevance: {relevance}/10\n"
-                    except:
-                        pass
+                async def score(repo: Dict) -> int:
+                    async with semaphore:
+                        return await self._ai_calculate_relevance(search_term, repo)
+                
+                relevance_scores = await asyncio.gather(*(score(repo) for repo in top_results),
+                                                        return_exceptions=True)
+            
+            parts = [f"🔍 **AI-Discovered MCP Servers for '{search_term}'** ({len(github_results)} found):\n"]
+            
+            for i, (repo, relevance) in enumerate(zip(top_results, relevance_scores), 1):
+                parts.append(f"**{i}. {repo['name']}** ⭐ {repo.get('stargazers_count', 0)}")
+                parts.append(f"   📝 {repo.get('description', 'No description')}")
+                parts.append(f"   💻 Language: {repo.get('language', 'Unknown')}")
+                parts.append(f"   🔗 {repo['html_url']}")
                 
-                result += "\n"
+                if isinstance(relevance, int):
+                    parts.append(f"   🤖 AI Relevance: {relevance}/10")
+                
+                parts.append("")
+            
+            parts.append(f"💡 **Install any server:** 'setup [server_name] for {search_term}'")
+            result = "\n".join(parts)
             
-            result += f"💡 **Install any server:** 'setup [server_name] for {search_term}'"
+            if len(self._search_cache) >= _SEARCH_CACHE_MAXSIZE:
+                del self._search_cache[next(iter(self._search_cache))]
+            self._search_cache[search_term] = (now, result)
             return result
             
         except Exception as e:
             return f"❌ Error searching for MCP servers: {e}"
     
+    async def _llm_call(self, messages, timeout: float = _LLM_CALL_TIMEOUT, **invoke_kwargs) -> str:
+        """Invoke the LLM with a timeout so a slow Groq response cannot stall the request path"""
+        response = await asyncio.wait_for(self.llm.ainvoke(messages, **invoke_kwargs), timeout)
+        return response.content
+    
+    async def _cached_llm(self, tag: str, system: str, user: str, semantic: bool = False, **invoke_kwargs) -> str:
+        """Invoke the LLM through the exact-match and (opt-in) semantic response cache"""
+        key, embedding, now, cached = await self._lookup_llm_cache(tag, system, user, semantic)
+        if cached is not None:
+            return cached
+        
+        reply = await self._llm_call([
+            _system_message(system),
+            HumanMessage(content=user)
+        ], **invoke_kwargs)
+        
+        self._remember_llm_reply(tag, system, key, embedding, reply, now)
+        return reply
+    
+    async def _stream_llm_text(self, tag: str, system: str, user: str, semantic: bool = False) -> AsyncIterator[str]:
+        """Stream an LLM reply chunk by chunk through the response cache, within _LLM_STREAM_TIMEOUT"""
+        key, embedding, now, cached = await self._lookup_llm_cache(tag, system, user, semantic)
+        if cached is not None:
+            yield cached
+            return
+        
+        parts = []
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + _LLM_STREAM_TIMEOUT
+        messages = [_system_message(system), HumanMessage(content=user)]
+        async with aclosing(self.llm.astream(messages)) as stream:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(anext(stream), deadline - loop.time())
+                except StopAsyncIteration:
+                    break
+                parts.append(chunk.content)
+                yield chunk.content
+        
+        self._remember_llm_reply(tag, system, key, embedding, "".join(parts), now)
+    
+    async def _collect_stream(self, chunks: AsyncIterator[str]) -> str:
+        """Drain a streamed reply, forwarding each chunk to on_token when a streaming callback is set"""
+        parts = []
+        async with aclosing(chunks) as stream:
+            async for chunk in stream:
+                parts.append(chunk)
+                if self.on_token is not None:
+                    self.on_token(chunk)
+        return "".join(parts).strip()
+    
+    async def _lookup_llm_cache(self, tag: str, system: str, user: str,
+                                semantic: bool) -> Tuple[str, Any, float, Optional[str]]:
+        """Look a prompt up in the response cache; returns (key, embedding, timestamp, cached reply or None)"""
+        key = hashlib.blake2b(f"{tag}\0{system}\0{user}".encode()).hexdigest()
+        now = time.monotonic()
+        hit = self._llm_cache.pop(key, None)
+        if hit is not None and now - hit[0] < _LLM_RESPONSE_CACHE_TTL:
+            self._llm_cache[key] = hit  # re-insert as most recently used
+            logger.info("⚡ LLM cache hit: %s", tag)
+            return key, None, now, hit[1]
+        
+        # The semantic tier (opt-in, for free-text user input only) embeds the user text alone and
+        # matches within the same tag and system prompt; prompts whose user text is just a key
+        # ("Service: docker") stay exact-match, or one service would get another's reply
+        embedding = None
+        if semantic and SEMANTIC_CACHE_AVAILABLE:
+            try:
+                embedding = await asyncio.to_thread(_embed_text, user)
+            except Exception as e:
+                logger.warning("Semantic cache embedding failed: %s", e)
+            else:
+                reply = self._semantic_cache_lookup(_semantic_scope(tag, system), embedding, now)
+                if reply is not None:
+                    logger.info("⚡ Semantic LLM cache hit: %s", tag)
+                    self._store_llm_reply(key, reply, now)
+                    return key, embedding, now, reply
+        
+        return key, embedding, now, None
+    
+    def _remember_llm_reply(self, tag: str, system: str, key: str, embedding: Any, reply: str, now: float):
+        """Store a fresh LLM reply in the exact tier and, when embedded, the semantic tier"""
+        self._store_llm_reply(key, reply, now)
+        if embedding is not None:
+            if len(self._llm_embed_cache) >= _LLM_RESPONSE_CACHE_MAXSIZE:
+                self._llm_embed_cache.pop(0)
+            self._llm_embed_cache.append((now, _semantic_scope(tag, system), embedding, reply))
+    
+    def _store_llm_reply(self, key: str, reply: str, now: float):
+        """Cache an LLM reply by exact prompt hash, evicting the least recently used entry when full"""
+        if len(self._llm_cache) >= _LLM_RESPONSE_CACHE_MAXSIZE:
+            del self._llm_cache[next(iter(self._llm_cache))]
+        self._llm_cache[key] = (now, reply)
+    
+    def _semantic_cache_lookup(self, scope: str, embedding: "np.ndarray", now: float) -> Optional[str]:
+        """Return a cached reply for near-identical user text under the same tag and system prompt, if any"""
+        self._llm_embed_cache = [entry for entry in self._llm_embed_cache
+                                 if now - entry[0] < _LLM_RESPONSE_CACHE_TTL]
+        candidates = [entry for entry in self._llm_embed_cache if entry[1] == scope]
+        if not candidates:
+            return None
+        
+        # Embeddings are normalized, so one matrix-vector product gives every cosine similarity
+        scores = np.stack([entry[2] for entry in candidates]) @ embedding
+        best = int(np.argmax(scores))
+        return candidates[best][3] if scores[best] >= _SEMANTIC_CACHE_THRESHOLD else None
+    
     async def _ai_categorize_search_results(self, search_term: str, results: List[Dict]) -> Dict:
         """Use AI to categorize search results by relevance and quality"""
         try:
@@ -566,21 +1154,13 @@ Examples of good responses: docker, github, email, postgres, kubernetes, slack,
             return {"high": results[:3], "medium": results[3:], "low": []}
             
         except Exception as e:
-            logger.warning(f"AI categorization failed: {e}")
+            logger.warning("AI categorization failed: %s", e)
             return {"high": results[:2], "medium": results[2:4], "low": results[4:]}
     
     async def _ai_calculate_relevance(self, search_term: str, repo: Dict) -> int:
         """Calculate AI relevance score for a repository"""
         try:
-            system_prompt = f"""Rate the relevance of this repository for "{search_term}" integration on a scale of 1-10.
-
-Consider:
-- Name relevance to "{search_term}"
-- Description mentioning MCP or Model Context Protocol
-- Stars and activity as quality indicators
-- Language and technology stack
-
-Respond with ONLY a number 1-10."""
+            system_prompt = _SYS_RELEVANCE_SCORE.format(search_term=search_term)
 
             repo_info = {
                 "name": repo['name'],
@@ -590,12 +1170,12 @@ Respond with ONLY a number 1-10."""
             }
 
             messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=json.dumps(repo_info))
+                _system_message(system_prompt),
+                HumanMessage(content=_json_dumps(repo_info))
             ]
             
-            response = await self.llm.ainvoke(messages)
-            return int(response.content.strip())
+            reply = await self._llm_call(messages)
+            return int(reply.strip())
             
         except Exception as e:
             return 5  # Default relevance score
@@ -604,53 +1184,47 @@ Respond with ONLY a number 1-10."""
         """AI-enhanced fallback for unclear commands"""
         try:
             if self.mode == "groq" and hasattr(self, 'llm'):
-                system_prompt = """The user's command wasn't clearly understood. Based on their input, provide a helpful response that:
-
-1. Acknowledges what they might be trying to do
-2. Suggests 2-3 specific commands they could try
-3. Offers to help them find what they need
+                system_prompt = _SYS_FALLBACK
 
-Be helpful and specific. Use the user's original input to understand their intent."""
-
-                messages = [
-                    SystemMessage(content=system_prompt),
-                    HumanMessage(content=f"User input: {command.raw_input}")
-                ]
-                
-                response = await self.llm.ainvoke(messages)
-                return f"🤖 **AI Assistant:** {response.content}\n\n💡 **Try these commands:**\n  • 'what mcp servers are installed?'\n  • 'search for [technology] MCP servers'\n  • 'I need help with [specific task]'"
+                # Free-text input: rephrasings of the same unclear request can share one reply
+                reply = await self._cached_llm(
+                    "fallback", system_prompt,
+                    f"User input: {command.raw_input}",
+                    semantic=True
+                )
+                return f"🤖 **AI Assistant:** {reply}\n\n💡 **Try these commands:**\n  • 'what mcp servers are installed?'\n  • 'search for [technology] MCP servers'\n  • 'I need help with [specific task]'"
             elif self.mode == "demo_ai":
                 return await self._demo_ai_fallback_handler(command)
             
         except Exception as e:
-            logger.warning(f"AI fallback failed: {e}")
+            logger.warning("AI fallback failed: %s", e)
         
         # Basic fallback
         return self._suggest_commands(command)
     
     async def _demo_ai_fallback_handler(self, command: MCPCommand) -> str:
         """Demo AI fallback with intelligent suggestions"""
-        user_input = command.raw_input.lower()
+        tokens = set(_WORD_RE.findall(command.raw_input[:_FALLBACK_INPUT_MAX_CHARS].lower()))
         
         # Intelligent suggestions based on user input analysis
         suggestions = []
         
         # Technology-specific suggestions
-        if any(word in user_input for word in ['app', 'application', 'web', 'site', 'software']):
+        if tokens & _APP_KW:
             suggestions.extend([
                 "'I need monitoring for my web application'",
                 "'Set up GitHub integration for my app development'",
                 "'Help me with database connections for my app'"
             ])
         
-        if any(word in user_input for word in ['business', 'company', 'enterprise', 'team']):
+        if tokens & _BIZ_KW:
             suggestions.extend([
                 "'Set up email automation for my business'",
                 "'I need Slack integration for team communication'",
                 "'Help me with payment processing for my business'"
             ])
         
-        if any(word in user_input for word in ['data', 'information', 'analytics', 'metrics']):
+        if tokens & _DATA_KW:
             suggestions.extend([
                 "'I need database integration for data management'",
                 "'Set up analytics dashboard for my metrics'",
@@ -666,21 +1240,8 @@ Be helpful and specific. Use the user's original input to understand their inten
                 "'Set up payment processing for my project'"
             ]
         
-        return f"""🤖 **AI Analysis:** I understand you're looking for help, but I need a bit more context.
-
-**Based on your request, you might want to try:**
-{chr(10).join(f"  • {suggestion}" for suggestion in suggestions[:3])}
-
-**Or describe what you want to accomplish:**
-  • "I need help with [specific technology]"
-  • "I want to integrate [service] with my project"
-  • "Help me automate [specific task]"
-
-**Current system status:**
-  • Type 'what mcp servers are installed?' to see what's available
-  • Type 'list available mcp servers' to browse options
-
-💡 **The AI understands natural language - just describe what you need!**"""
+        bullets = "\n".join(["  • " + suggestion for suggestion in suggestions[:3]])
+        return _FALLBACK_HEADER + bullets + _FALLBACK_FOOTER
     
     async def _setup_mcp_server(self, mcp_name: str) -> str:
         """Setup MCP server with AI-powered discovery and installation"""
@@ -693,35 +1254,42 @@ Be helpful and specific. Use the user's original input to understand their inten
             if "already installed" in check_result.lower():
                 return check_result
             
-            # Use AI to enhance understanding of user intent
+            # All AI steps below share one time budget; past it, fall back to the deterministic path
+            ai_deadline = asyncio.get_running_loop().time() + _SETUP_AI_BUDGET
+            
+            # Use AI to enhance understanding of user intent and generate GitHub search terms (one call)
             if self.mode == "groq" and hasattr(self, 'llm'):
-                enhanced_intent = await self._ai_enhance_user_intent(mcp_name)
-                logger.info(f"🤖 AI Enhanced Intent: {enhanced_intent}")
+                try:
+                    async with asyncio.timeout_at(ai_deadline):
+                        enhanced_intent, search_terms = await self._ai_prep(mcp_name)
+                except TimeoutError:
+                    logger.warning("AI setup prep timed out, using default search terms")
+                    enhanced_intent, search_terms = mcp_name, self._default_search_terms(mcp_name)
+                logger.info("🤖 AI Enhanced Intent: %s", enhanced_intent)
             else:
                 enhanced_intent = mcp_name
-            
-            # Use AI to generate search terms for GitHub
-            search_terms = await self._generate_search_terms_for_mcp(enhanced_intent)
-            logger.info(f"🔍 AI-generated search terms for '{enhanced_intent}': {search_terms}")
+                search_terms = await self._generate_search_terms_for_mcp(enhanced_intent)
+            logger.info("🔍 AI-generated search terms for '%s': %s", enhanced_intent, search_terms)
             
             # Search GitHub using the AI-generated terms
             github_results = await self._search_github_for_mcp(search_terms)
             
             if github_results:
-                # Use AI to rank and select the best match
-                best_match = await self._ai_select_best_mcp_match(enhanced_intent, github_results)
+                # Use AI to rank and select the best match, and to explain why it was selected
+                ai_reasoning = ""
+                if self.mode == "groq" and hasattr(self, 'llm'):
+                    try:
+                        async with asyncio.timeout_at(ai_deadline):
+                            best_match, ai_reasoning = await self._ai_select_and_explain(enhanced_intent, github_results)
+                    except TimeoutError:
+                        logger.warning("AI selection timed out, using the most-starred result")
+                        best_match = max(github_results, key=lambda x: x.get('stargazers_count', 0))
+                else:
+                    best_match = await self._ai_select_best_mcp_match(enhanced_intent, github_results)
                 
                 if best_match:
-                    # Use AI to understand why this match was selected
-                    ai_reasoning = ""
-                    if self.mode == "groq" and hasattr(self, 'llm'):
-                        ai_reasoning = await self._ai_explain_selection(enhanced_intent, best_match)
-                    
                     # Attempt to install the best match
-                    logger.info(f"🚀 Installing AI-selected MCP: {best_match['name']}")
-                    
-                    # Create MCPServerInfo from GitHub result
-                    from ai_agent_protocol.core import MCPServerInfo
+                    logger.info("🚀 Installing AI-selected MCP: %s", best_match['name'])
                     
                     # Construct proper zip download URL
                     # GitHub's default branch is usually 'main' but could be 'master' or other
@@ -730,6 +1298,7 @@ Be helpful and specific. Use the user's original input to understand their inten
                         default_branch = 'main'
                     zip_download_url = f"{best_match['html_url']}/archive/refs/heads/{default_branch}.zip"
                     
+                    # Create MCPServerInfo from GitHub result
                     server_info = MCPServerInfo(
                         name=best_match['name'],
                         repository_url=best_match['html_url'],
@@ -782,7 +1351,11 @@ Be helpful and specific. Use the user's original input to understand their inten
             
             # If no GitHub results, use AI to provide intelligent suggestions
             if self.mode == "groq" and hasattr(self, 'llm'):
-                ai_suggestions = await self._ai_suggest_alternatives(enhanced_intent)
+                try:
+                    async with asyncio.timeout_at(ai_deadline):
+                        ai_suggestions = await self._collect_stream(self._ai_suggest_alternatives(enhanced_intent))
+                except TimeoutError:
+                    ai_suggestions = _ALTERNATIVES_FALLBACK.format(intent=enhanced_intent)
                 return f"""🤖 AI Analysis: No direct MCP servers found for '{enhanced_intent}'
 
 {ai_suggestions}
@@ -805,38 +1378,92 @@ Be helpful and specific. Use the user's original input to understand their inten
 💡 **Custom Integration:** You might need to create a custom MCP for {mcp_name}"""
                 
         except Exception as e:
-            logger.error(f"Error in AI-powered MCP setup: {e}")
+            logger.error("Error in AI-powered MCP setup: %s", e)
             return f"❌ Error setting up {mcp_name} MCP server: {e}"
     
+    async def _ai_prep(self, mcp_name: str) -> Tuple[str, List[str]]:
+        """Use one AI call to enhance the user intent and generate GitHub search terms"""
+        try:
+            reply = await self._cached_llm(
+                "setup_prep", _SETUP_PREP_PROMPT,
+                f"Service: {mcp_name}",
+                response_format={"type": "json_object"}
+            )
+            parsed = _decode_json_prefix(reply)
+            intent = parsed.get("intent")
+            search_terms = parsed.get("search_terms")
+            if isinstance(intent, str) and intent.strip() and isinstance(search_terms, list) and search_terms and \
+                    all(isinstance(term, str) for term in search_terms):
+                return intent.strip(), search_terms
+            logger.warning("AI setup prep returned an unexpected shape: %s", parsed)
+            
+        except Exception as e:
+            logger.warning("AI setup prep failed, using separate calls: %s", e)
+        
+        # Fallback: the original two-step path
+        enhanced_intent = await self._ai_enhance_user_intent(mcp_name)
+        return enhanced_intent, await self._generate_search_terms_for_mcp(enhanced_intent)
+    
+    async def _ai_select_and_explain(self, intent: str, github_results: List[Dict]) -> Tuple[Optional[Dict], str]:
+        """Use one AI call to select the best repository and explain the choice"""
+        # The local embedding rerank needs no LLM for selection; only the explanation remains
+        if SEMANTIC_CACHE_AVAILABLE and not _SELECT_WITH_LLM:
+            best_match = await self._ai_select_best_mcp_match(intent, github_results)
+            return best_match, (await self._collect_stream(self._ai_explain_selection(intent, best_match)) if best_match else "")
+        
+        candidates = github_results[:5]
+        try:
+            repo_info = [
+                {
+                    "index": i,
+                    "name": repo['name'],
+                    "description": repo.get('description', ''),
+                    "stars": repo.get('stargazers_count', 0),
+                    "language": repo.get('language', 'Unknown')
+                }
+                for i, repo in enumerate(candidates)
+            ]
+            reply = await self._cached_llm(
+                "select_and_explain", _SETUP_SELECT_PROMPT,
+                f"User intent: {intent}\nRepositories to analyze:\n{_json_dumps(repo_info)}",
+                response_format={"type": "json_object"}
+            )
+            parsed = _decode_json_prefix(reply)
+            index = parsed.get("index")
+            if isinstance(index, int) and -1 <= index < len(candidates):
+                if index == -1:
+                    return None, ""
+                return candidates[index], str(parsed.get("reason") or "").strip()
+            logger.warning("AI select-and-explain returned an unexpected shape: %s", parsed)
+            
+        except Exception as e:
+            logger.warning("AI select-and-explain failed, using separate calls: %s", e)
+        
+        # Fallback: the original select-then-explain path
+        best_match = await self._ai_select_best_mcp_match(intent, github_results)
+        return best_match, (await self._collect_stream(self._ai_explain_selection(intent, best_match)) if best_match else "")
+    
     async def _generate_search_terms_for_mcp(self, mcp_name: str) -> List[str]:
         """Use AI to generate search terms for finding MCP servers"""
         try:
             if self.mode == "groq" and hasattr(self, 'llm'):
-                system_prompt = """Generate 3 search terms for finding MCP (Model Context Protocol) servers on GitHub.
-
-Given a service/technology name, provide exactly 3 search terms that would find relevant MCP servers.
-
-Examples:
-docker → ["docker mcp", "mcp docker", "docker-mcp-server"]
-email → ["email mcp", "mcp email", "email-mcp-server"]
-monitoring → ["monitoring mcp", "mcp monitoring", "monitoring-mcp"]
+                system_prompt = _SYS_SEARCH_TERMS
 
-Respond with a JSON array of exactly 3 search terms, no other text."""
-
-                messages = [
-                    SystemMessage(content=system_prompt),
-                    HumanMessage(content=f"Service: {mcp_name}")
-                ]
-                
-                response = await self.llm.ainvoke(messages)
-                search_terms = json.loads(response.content.strip())
+                reply = await self._cached_llm(
+                    "search_terms", system_prompt,
+                    f"Service: {mcp_name}"
+                )
+                search_terms = _json_loads(reply)
                 
                 return search_terms if isinstance(search_terms, list) else [f"{mcp_name} mcp"]
                 
         except Exception as e:
-            logger.warning(f"AI search term generation failed: {e}")
+            logger.warning("AI search term generation failed: %s", e)
         
-        # Fallback search terms - only 3 terms
+        return self._default_search_terms(mcp_name)
+    
+    def _default_search_terms(self, mcp_name: str) -> List[str]:
+        """Fallback search terms - only 3 terms"""
         return [
             f"{mcp_name} mcp",
             f"mcp {mcp_name}",
@@ -845,61 +1472,59 @@ Respond with a JSON array of exactly 3 search terms, no other text."""
     
     async def _search_github_for_mcp(self, search_terms: List[str]) -> List[Dict]:
         """Search GitHub for MCP servers using AI-generated terms"""
-        import aiohttp
         results = []
+        seen = set()  # ids already accepted, so duplicates across terms skip the filter entirely
         
         try:
-            async with aiohttp.ClientSession() as session:
-                for term in search_terms[:3]:  # Limit to 3 terms to avoid rate limits
-                    url = f"https://api.github.com/search/repositories?q={term}&sort=stars&order=desc&per_page=5"
+            session = await self._get_http_session()
+            # Limit to 3 terms to avoid rate limits; all requests run concurrently
+            terms = search_terms[:_GITHUB_SEARCH_TERMS]
+            responses = await asyncio.gather(*(self._fetch_github_search(session, term) for term in terms),
+                                             return_exceptions=True)
+            
+            for term, items in zip(terms, responses):
+                if isinstance(items, Exception):
+                    logger.warning("GitHub search for '%s' failed: %s", term, items)
+                    continue
+                if not items:
+                    continue
+                
+                service_keyword = term.split()[0].lower()
+                service_pattern = _SERVICE_KW_RE.get(service_keyword)
+                for item in items:
+                    if item['id'] in seen:
+                        continue
                     
-                    async with session.get(url) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            for item in data.get('items', []):
-                                # Use simple filtering first, then AI for final selection
-                                name = item['name'].lower()
-                                desc = (item.get('description') or '').lower()
-                                
-                                # Enhanced MCP filtering - must be MCP AND service-specific
-                                service_keyword = term.split()[0].lower()
-                                if ('mcp' in name or 'mcp' in desc or 'model context protocol' in desc):
-                                    # If it's an MCP server, check if it's relevant to the service
-                                    if (service_keyword in name or service_keyword in desc or
-                                        # Additional service-specific keywords
-                                        (service_keyword == 'docker' and any(kw in desc for kw in ['container', 'docker', 'containerization'])) or
-                                        (service_keyword == 'email' and any(kw in desc for kw in ['email', 'mail', 'smtp'])) or
-                                        (service_keyword == 'github' and any(kw in desc for kw in ['git', 'github', 'repository'])) or
-                                        (service_keyword == 'monitoring' and any(kw in desc for kw in ['monitor', 'observability', 'metrics'])) or
-                                        # Generic fallback for other services
-                                        service_keyword in name):
-                                        results.append(item)
-                        
-                        await asyncio.sleep(0.5)  # Rate limiting
-            
-            # Remove duplicates 
-            seen = set()
-            unique_results = []
-            for repo in results:
-                if repo['id'] not in seen:
-                    seen.add(repo['id'])
-                    unique_results.append(repo)
+                    # Use simple filtering first, then AI for final selection
+                    name = item['name'].lower()
+                    desc = (item.get('description') or '').lower()
+                    
+                    # Enhanced MCP filtering - must be MCP AND service-specific
+                    if _MCP_RE.search(f"{name} {desc}"):
+                        # If it's an MCP server, check if it's relevant to the service
+                        if (service_keyword in name or service_keyword in desc or
+                            # Additional service-specific keywords
+                            (service_pattern is not None and service_pattern.search(desc))):
+                            seen.add(item['id'])
+                            results.append(item)
             
             # Sort by relevance first, then by stars
             # Prioritize repositories with service name in the title
+            # Extract service name from first search term (once, not per repository)
+            service_name = search_terms[0].split()[0].lower() if search_terms else ""
+            service_suffix = f"{service_name}-mcp"
+            service_prefix = f"mcp-{service_name}"
+            
             def relevance_score(repo):
                 name = repo['name'].lower()
                 desc = (repo.get('description') or '').lower()
                 stars = repo.get('stargazers_count', 0)
                 
-                # Extract service name from first search term
-                service_name = search_terms[0].split()[0].lower() if search_terms else ""
-                
                 # Relevance scoring
                 score = 0
                 if service_name in name:
                     score += 1000  # High priority for service name in repo name
-                if f"{service_name}-mcp" in name or f"mcp-{service_name}" in name:
+                if service_suffix in name or service_prefix in name:
                     score += 500   # High priority for specific MCP server naming
                 if service_name in desc and "mcp" in desc:
                     score += 100   # Medium priority for service mentioned in MCP description
@@ -909,28 +1534,119 @@ Respond with a JSON array of exactly 3 search terms, no other text."""
                 
                 return score
             
-            unique_results.sort(key=relevance_score, reverse=True)
+            results.sort(key=relevance_score, reverse=True)
             
-            logger.info(f"🔍 Found {len(unique_results)} relevant repositories")
-            return unique_results[:10]  # Return top 10
+            logger.info("🔍 Found %s relevant repositories", len(results))
+            return results[:10]  # Return top 10
                         
         except Exception as e:
-            logger.error(f"GitHub search failed: {e}")
+            logger.error("GitHub search failed: %s", e)
         
         return results
     
+    async def _get_http_session(self):
+        """Return the shared aiohttp session, (re)creating it if closed or bound to another event loop"""
+        import aiohttp
+        loop = asyncio.get_running_loop()
+        if self._http_session is not None and not self._http_session.closed and self._http_session_loop is not loop:
+            # A session from an earlier event loop cannot be reused: close it rather than leak its connector
+            stale, self._http_session = self._http_session, None
+            try:
+                await stale.close()
+            except Exception as e:
+                # Transports of an already closed loop cannot be closed cleanly; drop them with the session
+                logger.debug("Could not close HTTP session from a previous event loop: %s", e)
+                stale.detach()
+        if self._http_session is None or self._http_session.closed:
+            self._http_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=16, ttl_dns_cache=300, keepalive_timeout=75),
+                timeout=aiohttp.ClientTimeout(total=15),
+                headers=_GITHUB_HEADERS
+            )
+            self._http_session_loop = loop
+        return self._http_session
+    
+    async def prewarm(self):
+        """Load lazily initialised resources ahead of the first request (e.g. while waiting for input)"""
+        if self.mode == "groq" and SEMANTIC_CACHE_AVAILABLE:
+            try:
+                await asyncio.to_thread(_embed_text, "warmup")
+            except Exception as e:
+                logger.warning("Embedding model prewarm failed: %s", e)
+    
+    async def close(self):
+        """Release the shared HTTP session and stop the Groq batch worker"""
+        if self._http_session is not None and not self._http_session.closed:
+            await self._http_session.close()
+        self._http_session = None
+        
+        if self._batch_task is not None and not self._batch_task.done():
+            self._batch_task.cancel()
+        self._batch_task = None
+    
+    async def _fetch_github_search(self, session, term: str) -> List[Dict]:
+        """Run one GitHub repository search, reusing the cached items when GitHub answers 304"""
+        url = f"https://api.github.com/search/repositories?q={term}&sort=stars&order=desc&per_page=5"
+        headers = {}
+        cached = self._gh_etag.pop(url, None)
+        if cached:
+            self._gh_etag[url] = cached  # re-insert as most recently used
+            headers["If-None-Match"] = cached[0]
+        
+        await self._wait_for_github_budget()
+        
+        async with session.get(url, headers=headers) as response:
+            self._update_github_budget(response.headers)
+            if response.status == 304 and cached:
+                return cached[1]
+            if response.status == 200:
+                data = await response.json()
+                items = data.get('items', [])
+                etag = response.headers.get("ETag")
+                if etag:
+                    self._gh_etag.pop(url, None)
+                    if len(self._gh_etag) >= _GITHUB_ETAG_CACHE_MAXSIZE:
+                        del self._gh_etag[next(iter(self._gh_etag))]
+                    self._gh_etag[url] = (etag, items)
+                return items
+        
+        return []
+    
+    async def _wait_for_github_budget(self):
+        """Sleep until the rate-limit window resets, but only if GitHub said the budget is nearly spent"""
+        if self._gh_budget is None:
+            return
+        
+        remaining, reset = self._gh_budget
+        if remaining < _GITHUB_RATE_LIMIT_FLOOR:
+            delay = min(reset - time.time(), _GITHUB_RATE_LIMIT_MAX_WAIT)
+            if delay > 0:
+                logger.info("⏳ GitHub search rate limit nearly reached, waiting %.0fs", delay)
+                await asyncio.sleep(delay)
+            self._gh_budget = None
+    
+    def _update_github_budget(self, headers):
+        """Remember the rate-limit budget GitHub reported on its latest response"""
+        try:
+            self._gh_budget = (int(headers["X-RateLimit-Remaining"]), int(headers["X-RateLimit-Reset"]))
+        except (KeyError, TypeError, ValueError):
+            pass
+    
     async def _ai_check_repo_relevance(self, search_term: str, repo: Dict) -> bool:
         """Use AI to check if a repository is relevant to the search term"""
+        # Clear-cut cases are decided lexically; only ambiguous ones reach the LLM
+        name = repo['name'].lower()
+        desc = (repo.get('description') or '').lower()
+        term = search_term.lower()
+        has_service = term in name or term in desc
+        has_mcp = bool(_MCP_RE.search(f"{name} {desc}"))
+        if has_service and has_mcp:
+            return True
+        if not has_service and not has_mcp:
+            return False
+        
         try:
-            system_prompt = f"""Determine if this GitHub repository is relevant for '{search_term}' MCP server needs.
-
-Consider:
-- Repository name and description
-- Whether it's related to MCP (Model Context Protocol)
-- If it could help with '{search_term}' integration
-- Quality indicators (stars, recent activity)
-
-Respond with only "yes" or "no"."""
+            system_prompt = _SYS_REPO_RELEVANCE.format(search_term=search_term)
 
             repo_info = {
                 "name": repo['name'],
@@ -938,18 +1654,16 @@ Respond with only "yes" or "no"."""
                 "stars": repo.get('stargazers_count', 0)
             }
 
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=f"Search term: {search_term}\nRepository: {json.dumps(repo_info)}")
-            ]
-            
-            response = await self.llm.ainvoke(messages)
-            result = response.content.strip().lower()
+            reply = await self._cached_llm(
+                "repo_relevance", system_prompt,
+                f"Search term: {search_term}\nRepository: {_json_dumps(repo_info)}"
+            )
+            result = reply.strip().lower()
             
             return result == "yes"
             
         except Exception as e:
-            logger.warning(f"AI relevance check failed: {e}")
+            logger.warning("AI relevance check failed: %s", e)
             return True  # Default to include if AI fails
     
     async def _ai_select_best_mcp_match(self, mcp_name: str, github_results: List[Dict]) -> Optional[Dict]:
@@ -958,6 +1672,9 @@ Respond with only "yes" or "no"."""
             if not github_results or self.mode != "groq" or not hasattr(self, 'llm'):
                 return github_results[0] if github_results else None
             
+            if SEMANTIC_CACHE_AVAILABLE and not _SELECT_WITH_LLM:
+                return await asyncio.to_thread(self._embedding_select_best_mcp_match, mcp_name, github_results[:5])
+            
             # Prepare repository information for AI analysis
             repo_info = []
             for i, repo in enumerate(github_results[:5]):  # Limit to top 5
@@ -971,34 +1688,13 @@ Respond with only "yes" or "no"."""
                 }
                 repo_info.append(info)
             
-            system_prompt = f"""You are selecting the best MCP server repository for "{mcp_name}" integration.
-
-CRITICAL INSTRUCTIONS:
-1. You MUST respond with ONLY a single number (0-4) or -1
-2. Do NOT include any explanatory text, descriptions, or reasoning
-3. ONLY select repositories that are specifically designed for "{mcp_name}"
-4. If NO repository is specifically for "{mcp_name}", respond with -1
-
-Selection criteria (in order of importance):
-1. Repository name contains "{mcp_name}" 
-2. Repository description mentions "{mcp_name}" integration or "{mcp_name}" MCP
-3. Repository is clearly an MCP server FOR "{mcp_name}" (not a general tool)
-4. Reject generic MCP tools, web panels, or management interfaces
-
-For "{mcp_name}", ONLY accept repositories that are:
-- Specifically designed as MCP servers for "{mcp_name}"
-- Have "{mcp_name}" in the name or are clearly "{mcp_name}"-focused
-- Are NOT general management tools or web interfaces
-
-RESPOND WITH ONLY ONE NUMBER: 0, 1, 2, 3, 4, or -1"""
+            system_prompt = _SYS_SELECT_BEST.format(mcp_name=mcp_name)
 
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=f"Repositories to analyze:\n{json.dumps(repo_info, indent=2)}")
-            ]
-            
-            response = await self.llm.ainvoke(messages)
-            response_text = response.content.strip()
+            reply = await self._cached_llm(
+                "select_best", system_prompt,
+                f"Repositories to analyze:\n{_json_dumps(repo_info, indent=True)}"
+            )
+            response_text = reply.strip()
             
             # Extract number from response (in case AI adds extra text)
             import re
@@ -1006,7 +1702,7 @@ RESPOND WITH ONLY ONE NUMBER: 0, 1, 2, 3, 4, or -1"""
             if number_match:
                 selected_index = int(number_match.group(1))
             else:
-                logger.warning(f"AI returned invalid response: {response_text}")
+                logger.warning("AI returned invalid response: %s", response_text)
                 selected_index = -1
             
             if selected_index == -1:
@@ -1016,52 +1712,75 @@ RESPOND WITH ONLY ONE NUMBER: 0, 1, 2, 3, 4, or -1"""
                 return github_results[selected_index]
                 
         except Exception as e:
-            logger.warning(f"AI selection failed: {e}")
+            logger.warning("AI selection failed: %s", e)
         
         # Fallback: return the first result with most stars
         return max(github_results, key=lambda x: x.get('stargazers_count', 0)) if github_results else None
     
+    def _embedding_select_best_mcp_match(self, mcp_name: str, candidates: List[Dict]) -> Optional[Dict]:
+        """Rerank candidates by embedding similarity to the request, weighted by log star count"""
+        texts = [f"{repo['name']} {repo.get('description') or ''}" for repo in candidates]
+        embeddings = _embed_text([mcp_name] + texts)
+        similarities = embeddings[1:] @ embeddings[0]
+        
+        # Nothing is about this service at all: same meaning as the LLM answering -1
+        if similarities.max() < _SELECT_MIN_SIMILARITY:
+            return None
+        
+        stars = np.array([repo.get('stargazers_count', 0) for repo in candidates], dtype=float)
+        scores = similarities * np.log1p(stars)
+        return candidates[int(np.argmax(scores))]
+    
     async def _ai_enhance_user_intent(self, mcp_name: str) -> str:
-        """Use AI to enhance understanding of user intent"""
+        """Use AI to enhance understanding of user intent (memoized on the normalized name)"""
+        key = mcp_name.strip().lower()
+        enhanced = self._intent_cache.pop(key, None)
+        if enhanced is not None:
+            self._intent_cache[key] = enhanced  # re-insert as most recently used
+            return enhanced
+        
+        task = self._intent_inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._enhance_intent_uncached(key))
+            self._intent_inflight[key] = task
+            task.add_done_callback(lambda done: self._forget_intent_task(key, done))
+        
         try:
-            system_prompt = f"""You are analyzing a user's request for MCP server setup. The user mentioned '{mcp_name}'.
-
-Based on this, provide a more specific and enhanced understanding of what they likely need.
-
-Examples:
-- "docker" → "docker container management and orchestration"
-- "email" → "email automation and SMTP integration"  
-- "monitoring" → "application performance monitoring and observability"
-- "github" → "git repository management and version control"
-- "payment" → "payment processing and financial transactions"
-
-Respond with a more descriptive phrase that captures the user's likely intent, keep it concise (under 8 words)."""
-
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=f"User wants: {mcp_name}")
-            ]
-            
-            response = await self.llm.ainvoke(messages)
-            enhanced = response.content.strip()
-            
-            return enhanced if enhanced else mcp_name
-            
+            # shield: a caller's timeout must not cancel the call other callers are waiting on
+            enhanced = await asyncio.shield(task)
         except Exception as e:
-            logger.warning(f"AI intent enhancement failed: {e}")
+            logger.warning("AI intent enhancement failed: %s", e)
+            return mcp_name
+        
+        if not enhanced:
             return mcp_name
+        if len(self._intent_cache) >= _INTENT_CACHE_MAXSIZE:
+            del self._intent_cache[next(iter(self._intent_cache))]
+        self._intent_cache[key] = enhanced
+        return enhanced
+    
+    def _forget_intent_task(self, key: str, task: asyncio.Task):
+        """Drop a finished shared intent call, retrieving its exception in case every waiter has gone"""
+        if self._intent_inflight.get(key) is task:
+            del self._intent_inflight[key]
+        if not task.cancelled():
+            task.exception()  # marks it retrieved: no "Task exception was never retrieved" warning
+    
+    async def _enhance_intent_uncached(self, mcp_name: str) -> str:
+        """Ask the LLM for the enhanced intent of a normalized service name"""
+        system_prompt = _SYS_ENHANCE_INTENT.format(mcp_name=mcp_name)
+        
+        reply = await self._cached_llm(
+            "enhance_intent", system_prompt,
+            f"User wants: {mcp_name}"
+        )
+        return reply.strip()
     
-    async def _ai_explain_selection(self, intent: str, selected_repo: Dict) -> str:
-        """Use AI to explain why a particular repository was selected"""
+    async def _ai_explain_selection(self, intent: str, selected_repo: Dict) -> AsyncIterator[str]:
+        """Use AI to explain why a particular repository was selected (streamed as it is generated)"""
+        produced = False
         try:
-            system_prompt = f"""Explain in 2-3 sentences why this repository is a good match for the user's '{intent}' needs.
-
-Focus on:
-- How the repository relates to their intent
-- Key features that make it suitable
-- Why it's better than alternatives
-
-Be concise and helpful."""
+            system_prompt = _SYS_EXPLAIN_SELECTION.format(intent=intent)
 
             repo_info = {
                 "name": selected_repo['name'],
@@ -1070,41 +1789,35 @@ Be concise and helpful."""
                 "language": selected_repo.get('language', '')
             }
 
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=f"User intent: {intent}\nSelected repository: {json.dumps(repo_info)}")
-            ]
-            
-            response = await self.llm.ainvoke(messages)
-            return response.content.strip()
+            async for chunk in self._stream_llm_text(
+                "explain_selection", system_prompt,
+                f"User intent: {intent}\nSelected repository: {_json_dumps(repo_info)}"
+            ):
+                produced = True
+                yield chunk
             
         except Exception as e:
-            logger.warning(f"AI explanation failed: {e}")
-            return f"This repository appears to be the best match for {intent} based on its popularity and description."
+            logger.warning("AI explanation failed: %s", e)
+            if not produced:
+                yield f"This repository appears to be the best match for {intent} based on its popularity and description."
     
-    async def _ai_suggest_alternatives(self, intent: str) -> str:
-        """Use AI to suggest alternatives when no direct matches are found"""
+    async def _ai_suggest_alternatives(self, intent: str) -> AsyncIterator[str]:
+        """Use AI to suggest alternatives when no direct matches are found (streamed as it is generated)"""
+        produced = False
         try:
-            system_prompt = f"""The user is looking for MCP servers related to '{intent}' but none were found on GitHub.
+            system_prompt = _SYS_SUGGEST_ALTERNATIVES.format(intent=intent)
 
-Provide helpful suggestions for:
-1. Alternative search terms they could try
-2. Related technologies that might have MCP servers
-3. General advice for their use case
-
-Be encouraging and provide 3-4 concrete suggestions."""
-
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=f"No MCP servers found for: {intent}")
-            ]
-            
-            response = await self.llm.ainvoke(messages)
-            return response.content.strip()
+            async for chunk in self._stream_llm_text(
+                "suggest_alternatives", system_prompt,
+                f"No MCP servers found for: {intent}"
+            ):
+                produced = True
+                yield chunk
             
         except Exception as e:
-            logger.warning(f"AI alternatives failed: {e}")
-            return f"Consider searching for related technologies or creating a custom MCP server for {intent}."
+            logger.warning("AI alternatives failed: %s", e)
+            if not produced:
+                yield _ALTERNATIVES_FALLBACK.format(intent=intent)
     
     async def _check_mcp_availability(self, mcp_name: str) -> str:
         """Check MCP server availability"""
@@ -1113,26 +1826,26 @@ Be encouraging and provide 3-4 concrete suggestions."""
         
         try:
             # Check if already installed
-            python_path = self.base_path / "src" / "Base" / "MCP_structure" / "mcp_servers" / "python" / "servers" / f"{mcp_name.upper()}_MCP"
-            js_path = self.base_path / "src" / "Base" / "MCP_structure" / "mcp_servers" / "js" / "servers" / f"{mcp_name.upper()}_MCP"
+            servers_root = self.base_path / "src" / "Base" / "MCP_structure" / "mcp_servers"
+            server_dir_name = f"{mcp_name.upper()}_MCP"
             
-            if python_path.exists() or js_path.exists():
-                location = python_path if python_path.exists() else js_path
+            if server_dir_name in self._list_servers(servers_root / "python" / "servers") or \
+                    server_dir_name in self._list_servers(servers_root / "js" / "servers"):
                 return f"""✅ {mcp_name.title()} MCP server is already installed!
 
-📁 **Location:** {location.name}
+📁 **Location:** {server_dir_name}
 🎯 **Ready to use:** You can now create agents with this MCP server
 💡 **Try:** 'create monitoring agent with {mcp_name}'"""
             
             # Search for available servers
             servers = await self.protocol.list_available_mcp_servers(mcp_name)
             if servers:
-                result = f"🔍 Found {len(servers)} {mcp_name.title()} MCP servers available:\n\n"
+                parts = [f"🔍 Found {len(servers)} {mcp_name.title()} MCP servers available:\n\n"]
                 for i, server in enumerate(servers[:3], 1):
-                    result += f"  {i}. **{server.name}**\n"
-                    result += f"     {server.description} ({server.language})\n\n"
-                result += f"💡 **Install:** 'setup {mcp_name} mcp server'"
-                return result
+                    parts.append(f"  {i}. **{server.name}**\n")
+                    parts.append(f"     {server.description} ({server.language})\n\n")
+                parts.append(f"💡 **Install:** 'setup {mcp_name} mcp server'")
+                return "".join(parts)
             else:
                 return f"❌ No {mcp_name.title()} MCP servers found.\n💡 Try: 'list available mcp servers'"
                 
@@ -1152,19 +1865,21 @@ Be encouraging and provide 3-4 concrete suggestions."""
             if not servers:
                 return "❌ No MCP servers found.\n💡 Check your internet connection"
             
-            result = f"📋 **Available MCP Servers** ({len(servers)} found):\n\n"
+            parts = [f"📋 **Available MCP Servers** ({len(servers)} found):\n\n"]
             
             for i, server in enumerate(servers[:8], 1):  # Limit to 8
-                result += f"**{i}. {server.name}**\n"
-                result += f"   📝 {server.description}\n"
-                result += f"   🔧 Language: {server.language}\n"
-                result += f"   🔗 {server.repository_url}\n\n"
+                parts.extend([
+                    f"**{i}. {server.name}**\n",
+                    f"   📝 {server.description}\n",
+                    f"   🔧 Language: {server.language}\n",
+                    f"   🔗 {server.repository_url}\n\n"
+                ])
             
             if len(servers) > 8:
-                result += f"... and {len(servers) - 8} more servers available.\n\n"
+                parts.append(f"... and {len(servers) - 8} more servers available.\n\n")
             
-            result += "💡 **Install any server:** 'setup [server_name] mcp server'"
-            return result
+            parts.append("💡 **Install any server:** 'setup [server_name] mcp server'")
+            return "".join(parts)
             
         except Exception as e:
             return f"❌ Error listing servers: {e}"
@@ -1177,13 +1892,7 @@ Be encouraging and provide 3-4 concrete suggestions."""
         try:
             # Auto-determine agent type if not specified
             if not agent_type:
-                agent_type_map = {
-                    "langsmith": "monitoring_agent",
-                    "github": "devops_agent",
-                    "filesystem": "file_manager_agent",
-                    "pagerduty": "incident_management_agent"
-                }
-                agent_type = agent_type_map.get(mcp_name, "custom_agent")
+                agent_type = _AGENT_TYPE_MAP.get(mcp_name, "custom_agent")
             
             description = f"AI agent with {mcp_name.title()} MCP integration"
             
@@ -1194,10 +1903,10 @@ Be encouraging and provide 3-4 concrete suggestions."""
                 metadata={"created_via": "natural_language", "mcp_focus": mcp_name}
             )
             
-            logger.info(f"🤖 Creating {agent_type} with {mcp_name} MCP...")
+            logger.info("🤖 Creating %s with %s MCP...", agent_type, mcp_name)
             agent_config = await self.protocol.create_agent(request)
             
-            result = f"""✅ Successfully created AI agent!
+            parts = [f"""✅ Successfully created AI agent!
 
 🤖 **Agent Details:**
   • ID: {agent_config['id']}
@@ -1205,13 +1914,13 @@ Be encouraging and provide 3-4 concrete suggestions."""
   • Status: {agent_config['status']}
   • Description: {agent_config['description']}
 
-📦 **MCP Integrations:**"""
+📦 **MCP Integrations:**"""]
             
             for i, mcp in enumerate(agent_config['mcp_servers'], 1):
-                result += f"\n  {i}. {mcp['name']} - {mcp['description']}"
+                parts.append(f"\n  {i}. {mcp['name']} - {mcp['description']}")
             
-            result += f"\n\n🎯 Your {mcp_name.title()} agent is ready for operations!"
-            return result
+            parts.append(f"\n\n🎯 Your {mcp_name.title()} agent is ready for operations!")
+            return "".join(parts)
             
         except Exception as e:
             return f"❌ Error creating agent: {e}"
@@ -1222,40 +1931,32 @@ Be encouraging and provide 3-4 concrete suggestions."""
             python_servers_path = self.base_path / "src" / "Base" / "MCP_structure" / "mcp_servers" / "python" / "servers"
             js_servers_path = self.base_path / "src" / "Base" / "MCP_structure" / "mcp_servers" / "js" / "servers"
             
-            installed_servers = []
-            
-            # Check Python servers
-            if python_servers_path.exists():
-                for server_dir in python_servers_path.iterdir():
-                    if server_dir.is_dir() and not server_dir.name.startswith('.') and server_dir.name != '__pycache__':
-                        installed_servers.append(f"{server_dir.name} (Python)")
-            
-            # Check JS servers
-            if js_servers_path.exists():
-                for server_dir in js_servers_path.iterdir():
-                    if server_dir.is_dir() and not server_dir.name.startswith('.'):
-                        installed_servers.append(f"{server_dir.name} (JavaScript)")
+            # Check Python servers, then JS servers
+            installed_servers = [f"{name} (Python)" for name in self._list_servers(python_servers_path)]
+            installed_servers.extend(f"{name} (JavaScript)" for name in self._list_servers(js_servers_path))
             
             if installed_servers:
-                result = f"📦 **Installed MCP Servers ({len(installed_servers)}):**\n\n"
-                for i, server in enumerate(installed_servers, 1):
-                    result += f"  {i}. {server}\n"
+                parts = [f"📦 **Installed MCP Servers ({len(installed_servers)}):**\n\n"]
+                parts.extend(f"  {i}. {server}\n" for i, server in enumerate(installed_servers, 1))
                 
                 # Use AI to provide intelligent suggestions based on installed servers
                 if self.mode == "groq" and hasattr(self, 'llm'):
-                    ai_suggestions = await self._ai_analyze_installed_servers(installed_servers)
-                    result += f"\n🤖 **AI Analysis:**\n{ai_suggestions}\n"
+                    insight = await self._ai_combined_server_insight(installed_servers)
+                    parts.append("\n🤖 **AI Analysis:**\n")
+                    parts.extend(f"  • {title}: {insight[key]}\n" for key, title in _SERVER_INSIGHT_SECTIONS if insight.get(key))
                 
-                result += f"\n💡 **Actions you can take:**\n"
-                result += f"  • Create agents: 'create agent with [server_name]'\n"
-                result += f"  • Get help: 'what can I do with [server_name]?'\n"
-                result += f"  • Add more: 'I need help with [technology]'"
+                parts.append(
+                    "\n💡 **Actions you can take:**\n"
+                    "  • Create agents: 'create agent with [server_name]'\n"
+                    "  • Get help: 'what can I do with [server_name]?'\n"
+                    "  • Add more: 'I need help with [technology]'"
+                )
                 
-                return result
+                return "".join(parts)
             else:
                 # Use AI to provide intelligent getting started advice
                 if self.mode == "groq" and hasattr(self, 'llm'):
-                    ai_advice = await self._ai_getting_started_advice()
+                    ai_advice = await self._collect_stream(self._ai_getting_started_advice())
                     return f"""📦 No MCP servers currently installed.
 
 🤖 **AI Recommendations:**
@@ -1275,53 +1976,64 @@ Be encouraging and provide 3-4 concrete suggestions."""
         except Exception as e:
             return f"❌ Error getting status: {e}"
     
-    async def _ai_analyze_installed_servers(self, servers: List[str]) -> str:
-        """Use AI to analyze installed servers and provide intelligent suggestions"""
+    def _list_servers(self, path: Path) -> List[str]:
+        """List installed server directories under path, cached until the directory's mtime changes"""
         try:
-            system_prompt = """Analyze the installed MCP servers and provide helpful insights.
-
-Suggest:
-1. What the user can accomplish with these servers
-2. Potential workflows or combinations
-3. Missing servers that would complement these
-
-Be concise and actionable (3-4 sentences max)."""
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return []
+        
+        cached = self._dir_cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        
+        # scandir reuses the directory entry type, avoiding a stat() per server
+        with os.scandir(path) as entries:
+            names = [entry.name for entry in entries
+                     if entry.is_dir() and not entry.name.startswith('.') and entry.name != '__pycache__']
+        self._dir_cache[path] = (mtime, names)
+        return names
+    
+    async def _ai_combined_server_insight(self, servers: List[str]) -> Dict[str, str]:
+        """Use one AI call for the analysis, workflow and missing-server insights on installed servers"""
+        try:
+            system_prompt = _SYS_ANALYZE_INSTALLED
 
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=f"Installed servers: {', '.join(servers)}")
-            ]
-            
-            response = await self.llm.ainvoke(messages)
-            return response.content.strip()
+            reply = await self._cached_llm(
+                "analyze_installed", system_prompt,
+                f"Installed servers: {', '.join(sorted(servers))}"  # sorted so listing order cannot miss the cache
+            )
+            try:
+                parsed = _decode_json_prefix(reply)
+            except ValueError:
+                parsed = None
+            if not isinstance(parsed, dict):
+                # Model ignored the JSON format: show the whole reply as the analysis
+                return {"analysis": reply.strip()}
+            return {key: str(parsed[key]).strip() for key, _ in _SERVER_INSIGHT_SECTIONS if parsed.get(key)}
             
         except Exception as e:
-            logger.warning(f"AI server analysis failed: {e}")
-            return "You have several MCP servers installed and ready to use!"
+            logger.warning("AI server analysis failed: %s", e)
+            return {"analysis": "You have several MCP servers installed and ready to use!"}
     
-    async def _ai_getting_started_advice(self) -> str:
-        """Use AI to provide getting started advice when no servers are installed"""
+    async def _ai_getting_started_advice(self) -> AsyncIterator[str]:
+        """Use AI to provide getting started advice when no servers are installed (streamed as it is generated)"""
+        produced = False
         try:
-            system_prompt = """The user has no MCP servers installed yet. Provide encouraging and helpful advice for getting started.
-
-Include:
-1. Popular use cases for MCP servers
-2. Easy first servers to install
-3. How to explore what's available
+            system_prompt = _SYS_GETTING_STARTED
 
-Be encouraging and specific (3-4 sentences)."""
-
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content="User has no MCP servers installed, what should they do?")
-            ]
-            
-            response = await self.llm.ainvoke(messages)
-            return response.content.strip()
+            # Fixed prompt: an exact-match cache hit serves every repeat status check
+            async for chunk in self._stream_llm_text(
+                "getting_started", system_prompt,
+                "User has no MCP servers installed, what should they do?"
+            ):
+                produced = True
+                yield chunk
             
         except Exception as e:
-            logger.warning(f"AI getting started advice failed: {e}")
-            return "Start by telling me what you want to accomplish! For example: 'I need to manage my Docker containers' or 'Help me set up monitoring for my apps'."
+            logger.warning("AI getting started advice failed: %s", e)
+            if not produced:
+                yield "Start by telling me what you want to accomplish! For example: 'I need to manage my Docker containers' or 'Help me set up monitoring for my apps'."
     
     def _suggest_commands(self, command: MCPCommand) -> str:
         """Suggest valid commands"""
@@ -1338,46 +2050,113 @@ Be encouraging and specific (3-4 sentences)."""
 
 💡 **Try:** 'setup github mcp server'"""
 
+# Interactive/demo text, written with one sys.stdout.write each
+_INTERACTIVE_BANNER = """🤖 Enhanced AI Agent Protocol - AI-Powered Natural Language Interface
+======================================================================
+🧠 AI Mode: {mode} ({engine})
+
+🆕 **AI-Powered Features:**
+  🎯 Understands ANY MCP server request (not just predefined)
+  🔍 Searches GitHub automatically for matching servers
+  🤖 AI selects the best match for your needs
+  📝 Natural language understanding of user intent
+
+**Examples of what you can say:**
+  • 'I need to manage my Docker containers'
+  • 'Help me set up email automation'
+  • 'I want to monitor my application performance'
+  • 'Set up payment processing for my app'
+  • 'I need to work with my PostgreSQL database'
+  • 'Help me integrate with Kubernetes'
+  • 'Search for machine learning MCP servers'
+  • 'Find MCP servers for social media integration'
+
+**Traditional commands still work:**
+  • 'setup github mcp server'
+  • 'what mcp servers are installed?'
+  • 'create monitoring agent with langsmith'
+
+Type 'quit' to exit
+======================================================================
+"""
+
+_DEMO_FOOTER = """
+🎉 AI Demo Complete!
+
+🚀 **Key AI Features Demonstrated:**
+  ✅ Natural language understanding (not just keywords)
+  ✅ Intent recognition from user descriptions
+  ✅ Automatic GitHub search for MCP servers
+  ✅ AI-powered server selection and ranking
+  ✅ Context-aware responses and suggestions
+
+💡 **Try interactive mode:**
+python src/enhanced_ai_protocol_working.py
+"""
+
+async def _ainput(prompt: str) -> str:
+    """input() on a daemon thread, so the event loop keeps running and a pending read never blocks exit"""
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    
+    def settle(value: Any, error: Optional[BaseException]) -> None:
+        if not future.done():
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(value)
+    
+    def read() -> None:
+        try:
+            value, error = input(prompt), None
+        except BaseException as e:
+            value, error = None, e
+        try:
+            loop.call_soon_threadsafe(settle, value, error)
+        except RuntimeError:
+            pass  # loop already closed
+    
+    threading.Thread(target=read, daemon=True).start()
+    return await future
+
 class EnhancedMCPCLI:
     """Enhanced CLI with natural language processing"""
     
     def __init__(self, groq_api_key: str = None):
         self.base_path = Path(__file__).parent.parent
         self.processor = NaturalLanguageMCPProcessor(str(self.base_path), groq_api_key)
+        self._streamed = False  # whether the current request has printed streamed AI text yet
+    
+    def _print_token(self, chunk: str):
+        """Print streamed AI text as it arrives, ahead of the formatted response"""
+        if not self._streamed:
+            self._streamed = True
+            sys.stdout.write("💭 ")
+        sys.stdout.write(chunk)
+        sys.stdout.flush()
     
     async def interactive_mode(self):
         """Interactive mode with AI-powered MCP understanding"""
-        print("🤖 Enhanced AI Agent Protocol - AI-Powered Natural Language Interface")
-        print("=" * 70)
-        print(f"🧠 AI Mode: {self.processor.mode.title()}" + (" (Groq LLM)" if self.processor.mode == "groq" else " (Enhanced Pattern Matching)"))
-        print()
-        print("🆕 **AI-Powered Features:**")
-        print("  🎯 Understands ANY MCP server request (not just predefined)")
-        print("  🔍 Searches GitHub automatically for matching servers")
-        print("  🤖 AI selects the best match for your needs")
-        print("  📝 Natural language understanding of user intent")
-        print()
-        print("**Examples of what you can say:**")
-        print("  • 'I need to manage my Docker containers'")
-        print("  • 'Help me set up email automation'")
-        print("  • 'I want to monitor my application performance'")
-        print("  • 'Set up payment processing for my app'")
-        print("  • 'I need to work with my PostgreSQL database'")
-        print("  • 'Help me integrate with Kubernetes'")
-        print("  • 'Search for machine learning MCP servers'")
-        print("  • 'Find MCP servers for social media integration'")
-        print()
-        print("**Traditional commands still work:**")
-        print("  • 'setup github mcp server'")
-        print("  • 'what mcp servers are installed?'")
-        print("  • 'create monitoring agent with langsmith'")
-        print()
-        print("Type 'quit' to exit")
-        print("=" * 70)
+        mode = self.processor.mode
+        sys.stdout.write(_INTERACTIVE_BANNER.format(
+            mode=mode.title(), engine="Groq LLM" if mode == "groq" else "Enhanced Pattern Matching"
+        ))
         
+        # Warm up lazily loaded resources while the user types the first request
+        prewarm_task = asyncio.create_task(self.processor.prewarm())
+        self.processor.on_token = self._print_token
+        try:
+            await self._interactive_loop()
+        finally:
+            self.processor.on_token = None
+            prewarm_task.cancel()
+            await self.close()
+    
+    async def _interactive_loop(self):
+        """Read and answer requests until the user quits"""
         while True:
             try:
-                user_input = input("\n🎯 Your request: ").strip()
+                user_input = (await _ainput("\n🎯 Your request: ")).strip()
                 
                 if user_input.lower() in ['quit', 'exit', 'bye']:
                     print("👋 Goodbye!")
@@ -1389,13 +2168,17 @@ class EnhancedMCPCLI:
                 print(f"\n🤖 AI Processing: {user_input}")
                 print("-" * 50)
                 
+                self._streamed = False
                 response = await self.processor.process_command(user_input)
+                if self._streamed:
+                    print("\n")  # end the streamed preview line
                 
                 print("🎯 **AI Response:**")
                 print(response)
                 print("-" * 50)
                 
-            except KeyboardInterrupt:
+            except (KeyboardInterrupt, asyncio.CancelledError):
+                # Ctrl+C now reaches the loop as a cancellation rather than from inside input()
                 print("\n👋 Goodbye!")
                 break
             except Exception as e:
@@ -1404,9 +2187,13 @@ class EnhancedMCPCLI:
     async def process_command(self, command: str) -> str:
         """Process single command"""
         return await self.processor.process_command(command)
+    
+    async def close(self):
+        """Release network resources held by the processor"""
+        await self.processor.close()
 
-async def demo_enhanced_protocol():
-    """Demo the AI-enhanced protocol with natural language understanding"""
+async def demo_enhanced_protocol(interactive: bool = True):
+    """Demo the AI-enhanced protocol with natural language understanding (batch mode runs all commands concurrently)"""
     
     print("🚀 AI-Enhanced Agent Protocol Demo")
     print("=" * 50)
@@ -1432,31 +2219,42 @@ async def demo_enhanced_protocol():
         "Set up integration with my PostgreSQL database"
     ]
     
-    for i, command in enumerate(demo_commands, 1):
-        print(f"\n🎯 AI Demo {i}/6: '{command}'")
-        print("-" * 50)
-        
-        try:
-            response = await cli.process_command(command)
-            print("🤖 **AI Response:**")
-            print(response)
-        except Exception as e:
-            print(f"❌ Error: {e}")
-        
-        print("-" * 50)
-        
-        if i < len(demo_commands):
-            input("Press Enter to continue...")
+    try:
+        if interactive:
+            for i, command in enumerate(demo_commands, 1):
+                print(f"\n🎯 AI Demo {i}/6: '{command}'")
+                print("-" * 50)
+                
+                try:
+                    response = await cli.process_command(command)
+                    print("🤖 **AI Response:**")
+                    print(response)
+                except Exception as e:
+                    print(f"❌ Error: {e}")
+                
+                print("-" * 50)
+                
+                if i < len(demo_commands):
+                    input("Press Enter to continue...")
+        else:
+            # No Press-Enter gating, so the independent requests can overlap their network round-trips
+            responses = await asyncio.gather(*(cli.process_command(command) for command in demo_commands),
+                                             return_exceptions=True)
+            for i, (command, response) in enumerate(zip(demo_commands, responses), 1):
+                print(f"\n🎯 AI Demo {i}/6: '{command}'")
+                print("-" * 50)
+                
+                if isinstance(response, Exception):
+                    print(f"❌ Error: {response}")
+                else:
+                    print("🤖 **AI Response:**")
+                    print(response)
+                
+                print("-" * 50)
+    finally:
+        await cli.close()
     
-    print("\n🎉 AI Demo Complete!")
-    print("\n🚀 **Key AI Features Demonstrated:**")
-    print("  ✅ Natural language understanding (not just keywords)")
-    print("  ✅ Intent recognition from user descriptions")
-    print("  ✅ Automatic GitHub search for MCP servers")
-    print("  ✅ AI-powered server selection and ranking")
-    print("  ✅ Context-aware responses and suggestions")
-    print("\n💡 **Try interactive mode:**")
-    print("python src/enhanced_ai_protocol_working.py")
+    sys.stdout.write(_DEMO_FOOTER)
 
 async def main():
     """Main function"""
@@ -1466,6 +2264,10 @@ async def main():
     print("Natural language MCP server setup with Groq LLM")
     print()
     
+    if "--batch" in sys.argv[1:]:
+        await demo_enhanced_protocol(interactive=False)
+        return
+    
     choice = input("Choose mode:\n1. Demo mode\n2. Interactive mode\n3. Exit\n\nYour choice: ").strip()
     
     if choice == "1":
@@ -7,25 +7,64 @@ configures them according to their documentation requirements.
 
 import os
 import json
+import ast
 import asyncio
+import hashlib
+import importlib.util
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import aclosing
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Any, Tuple, Union
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict, replace
 import re
+import shutil
+import sys
 import tempfile
 from datetime import datetime
 
+from pydantic import BaseModel, ValidationError
+
 # LangChain imports
 try:
     from langchain_groq import ChatGroq
-    from langchain_core.messages import HumanMessage, SystemMessage
+    from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
     from langchain_core.prompts import ChatPromptTemplate
     from langchain_core.output_parsers import JsonOutputParser
     LANGCHAIN_AVAILABLE = True
 except ImportError:
     LANGCHAIN_AVAILABLE = False
 
+# Use orjson for faster JSON (de)serialization when available
+try:
+    import orjson
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj: Any, indent: bool = False) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None).decode()
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any, indent: bool = False) -> str:
+        return json.dumps(obj, indent=2 if indent else None)
+
+# Optional semantic tier for the README analysis cache (sentence embeddings);
+# sentence_transformers pulls in torch, so it is imported with the model in _embed_text
+SEMANTIC_CACHE_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+if SEMANTIC_CACHE_AVAILABLE:
+    import numpy as np
+
+# Shared HTTP connection pool for the LLM client (httpx ships with the Groq/OpenAI SDKs; HTTP/2 needs h2)
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
 # Load environment variables
 from dotenv import load_dotenv
 load_dotenv()
@@ -34,7 +73,205 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
+# System prompt for extracting an MCPConfiguration from a server README.
+# It is sent verbatim as the first message of every analysis request, so providers with
+# prompt-prefix caching (OpenAI automatically, Groq partially) reuse the processed prefix:
+# never interpolate into it or change it at runtime. Per-server text belongs in the HumanMessage.
+_README_ANALYSIS_PROMPT = """You are an expert at analyzing README files for MCP (Model Context Protocol) servers and extracting configuration information.
+
+Your task is to analyze a README file and extract the configuration needed to properly set up the MCP server.
+
+Extract and return ONLY a JSON object with these fields:
+- server_name: The name of the MCP server
+- command: The command to run the server (e.g., "python", "node", "uvx")
+- args: Array of command line arguments
+- env_vars: Object with required environment variables and their descriptions
+- install_method: How to install dependencies ("pip", "npm", "uvx", "manual")
+- dependencies: Array of required packages/dependencies
+- language: Programming language ("python", "javascript", "typescript")
+- build_required: Boolean if build step is needed
+- build_command: Build command if required
+- description: Brief description of what the server does
+- port: Port number if the server runs on a specific port (null if not specified)
+
+Guidelines:
+1. Look for installation instructions, usage examples, and configuration requirements
+2. Extract environment variables from code examples or documentation
+3. Identify the main command to run the server
+4. Note any build steps (npm run build, etc.)
+5. Parse dependencies from package.json, requirements.txt, pyproject.toml, etc.
+
+Example response:
+{
+  "server_name": "example-mcp",
+  "command": "python",
+  "args": ["main.py"],
+  "env_vars": {"API_KEY": "Your API key here"},
+  "install_method": "pip",
+  "dependencies": ["package1", "package2"],
+  "language": "python",
+  "build_required": false,
+  "build_command": null,
+  "description": "Example MCP server",
+  "port": null
+}
+
+Respond with ONLY the raw JSON object (no markdown code fences), no other text."""
+
+# Batched README analysis (configure_all_mcps): several READMEs per LLM call.
+# Built by appending to the single-README prompt, so both requests share its cacheable prefix
+_README_BATCH_PROMPT = _README_ANALYSIS_PROMPT + """
+
+You may instead receive several READMEs as a JSON array of {"id": ..., "mcp_name": ..., "readme": ...} objects.
+Then respond with ONLY a JSON object {"configurations": [...]} whose array holds one configuration object per README, each with an extra "id" field copied from its input."""
+
+# Part of every README-analysis cache key: editing either prompt invalidates the cached analyses
+_README_PROMPT_HASH = hashlib.sha256(_README_BATCH_PROMPT.encode('utf-8')).hexdigest()[:16]
+_CONFIG_LOG_MAX_EVENTS = 100  # mcp_config_log.jsonl is trimmed to this many events once per agent
+_README_BATCH_MAX_ITEMS = 6
+_README_BATCH_TOKEN_BUDGET = 6000  # estimated prompt tokens (chars // 4) per batch
+_README_BATCH_RETRIES = 2
+_README_PARSE_RETRIES = 2  # re-asks with the validation error when a single analysis is malformed
+# One configuration is well under 500 tokens; batches get this budget per README
+_README_MAX_TOKENS = 768
+# Both README requests ask for one JSON object, so the provider's JSON mode can enforce it (no markdown fences)
+_JSON_REPLY_KWARGS = {"response_format": {"type": "json_object"}}
+_JSON_START = re.compile(r'[{\[]')
+# READMEs sent to the LLM are cut down to their setup sections (badges, changelogs etc. add only tokens)
+_README_TRIM_MIN_CHARS = 4000  # shorter READMEs are sent whole
+_README_MAX_CHARS = 8000
+_README_INTRO_MAX_CHARS = 1000  # text before the first heading, kept for the description
+_README_HEADING = re.compile(r'^(#{1,3}) (.+)$', re.MULTILINE)
+_README_RELEVANT_SECTION = re.compile(r'instal|usage|config|env|run|quick ?start|getting started', re.IGNORECASE)
+# Concurrent README-analysis requests in configure_all_mcps
+_LLM_CONCURRENCY = int(os.getenv("MCP_CONFIG_CONCURRENCY", "8"))
+
+# Semantic README cache: forks and variants whose READMEs embed within this cosine similarity reuse an analysis
+_SEMANTIC_CACHE_THRESHOLD = 0.95
+# What is embedded: the trimmed README sent to the LLM, not the raw head (MiniLM reads ~256 tokens,
+# and templated READMEs share their opening); index entries embedded from other text are ignored
+_SEMANTIC_INDEX_TEXT = "relevant-sections"
+_EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+_embedding_model = None
+_embedding_model_lock = threading.Lock()
+_README_JS_HINTS = re.compile(r'package\.json|npm install|npx ', re.IGNORECASE)
+_README_PY_HINTS = re.compile(r'pyproject\.toml|requirements\.txt|pip install|uvx ', re.IGNORECASE)
+
+# Config-file parsing patterns, compiled once
+_PY_SERVERS_START = re.compile(r'ServersConfig\s*=\s*\[')
+_PY_SERVER_BLOCK = re.compile(r'\{[^}]*"server_name"[^}]*\}', re.DOTALL)
+_PY_NAME = re.compile(r'"server_name":\s*"([^"]*)"')
+_PY_COMMAND = re.compile(r'"command":\s*"([^"]*)"')
+_PY_ARGS = re.compile(r'"args":\s*(\[[^\]]*\])')
+_PY_ENV = re.compile(r'"env":\s*(\{[^}]*\})')
+_JS_SERVERS = re.compile(r'export const ServersConfig: any\[\] = \[(.*?)\];', re.DOTALL)
+_JS_SERVER_BLOCK = re.compile(r'\{[^}]*server_name[^}]*\}', re.DOTALL)
+_JS_NAME = re.compile(r'server_name:\s*"([^"]*)"')
+_JS_COMMAND = re.compile(r'command:\s*"([^"]*)"')
+_JS_ARGS = re.compile(r'args:\s*(\[[^\]]*\])')
+_JS_DESCRIPTION = re.compile(r'server_features_and_capability:\s*"([^"]*)"')
+
+def _extract_relevant_sections(readme: str) -> str:
+    """Keep the intro and the installation/usage/configuration sections of a long README, within _README_MAX_CHARS"""
+    if len(readme) < _README_TRIM_MIN_CHARS:
+        return readme
+        
+    headings = list(_README_HEADING.finditer(readme))
+    sections, covered_until = [], 0
+    for i, heading in enumerate(headings):
+        if heading.start() < covered_until or not _README_RELEVANT_SECTION.search(heading.group(2)):
+            continue
+        # A section runs until the next heading of the same or a higher level, subsections included
+        level = len(heading.group(1))
+        end = next((h.start() for h in headings[i + 1:] if len(h.group(1)) <= level), len(readme))
+        sections.append(readme[heading.start():end].strip())
+        covered_until = end
+        
+    if not sections:
+        return readme[:_README_MAX_CHARS]
+    intro = readme[:headings[0].start()].strip()[:_README_INTRO_MAX_CHARS]
+    return "\n\n".join([intro] + sections if intro else sections)[:_README_MAX_CHARS]
+
+def _chunk_readmes(items: List[Tuple[str, str]]) -> List[List[Tuple[str, str]]]:
+    """Split (mcp_name, readme) pairs into batches within the item and token budgets"""
+    batches, current, tokens = [], [], 0
+    for item in items:
+        cost = min(len(item[1]), _README_MAX_CHARS) // 4  # the README as sent, after trimming
+        if current and (len(current) >= _README_BATCH_MAX_ITEMS or tokens + cost > _README_BATCH_TOKEN_BUDGET):
+            batches.append(current)
+            current, tokens = [], 0
+        current.append(item)
+        tokens += cost
+    if current:
+        batches.append(current)
+    return batches
+
+@lru_cache(maxsize=8)
+def _system_message(content: str) -> "SystemMessage":
+    """Return a shared SystemMessage for this prompt, so every request sends the identical prefix"""
+    return SystemMessage(content=content)
+
+def _embed_text(text: Union[str, List[str]]) -> "np.ndarray":
+    """Embed text (or a list of texts) with the lazily loaded sentence-transformer, normalized for cosine similarity"""
+    global _embedding_model
+    if _embedding_model is None:
+        with _embedding_model_lock:
+            if _embedding_model is None:
+                from sentence_transformers import SentenceTransformer
+                _embedding_model = SentenceTransformer(_EMBEDDING_MODEL_NAME)
+    return _embedding_model.encode(text, normalize_embeddings=True)
+
+def _language_family(language: Optional[str]) -> Optional[str]:
+    """Collapse typescript into javascript: both are configured through the JS client"""
+    return "javascript" if language == "typescript" else language
+
+def _readme_language(readme_content: str) -> Optional[str]:
+    """Guess the server language from install hints in its README; None when absent or ambiguous"""
+    js = _README_JS_HINTS.search(readme_content) is not None
+    py = _README_PY_HINTS.search(readme_content) is not None
+    if js == py:
+        return None
+    return "javascript" if js else "python"
+
+class _JsonCloseScanner:
+    """Tracks bracket depth over streamed text, skipping string contents, to find where the first JSON value closes"""
+    __slots__ = ("depth", "in_string", "escaped")
+    
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        
+    def feed(self, text: str) -> int:
+        """Consume the next chunk; returns the index just past the closing bracket, or -1 while still open"""
+        for i, ch in enumerate(text):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == '\\':
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch in '{[':
+                self.depth += 1
+            elif ch in '}]' and self.depth:
+                self.depth -= 1
+                if not self.depth:
+                    return i + 1
+            elif ch == '"' and self.depth:
+                self.in_string = True
+        return -1
+
+def _cache_key(*parts: str) -> str:
+    """sha256 over length-prefixed parts, so different splits of the same text cannot collide"""
+    digest = hashlib.sha256()
+    for part in parts:
+        data = part.encode('utf-8')
+        digest.update(len(data).to_bytes(8, 'big'))
+        digest.update(data)
+    return digest.hexdigest()
+
+@dataclass(slots=True, frozen=True)
 class MCPConfiguration:
     """Represents MCP server configuration extracted from README"""
     server_name: str
@@ -49,7 +286,21 @@ class MCPConfiguration:
     build_required: bool = False
     build_command: Optional[str] = None
 
-@dataclass
+class MCPConfigSchema(BaseModel):
+    """Schema the README-analysis JSON must satisfy before it becomes an MCPConfiguration"""
+    server_name: Optional[str] = None
+    command: Optional[str] = None
+    args: List[str] = []
+    env_vars: Dict[str, str] = {}
+    install_method: Optional[str] = None
+    dependencies: List[str] = []
+    port: Optional[int] = None
+    description: str = ""
+    language: Optional[str] = None
+    build_required: bool = False
+    build_command: Optional[str] = None
+
+@dataclass(slots=True, frozen=True)
 class ConfigurationError:
     """Represents an error in configuration parsing"""
     error_type: str
@@ -59,23 +310,55 @@ class ConfigurationError:
 class MCPAutoConfigAgent:
     """AI Agent for automatic MCP server configuration using LangChain and Groq"""
     
-    def __init__(self, base_path: str = None):
+    def __init__(self, base_path: str = None, llm_cache_enabled: bool = True, llm_cache_ttl_days: float = 7):
         self.base_path = Path(base_path) if base_path else Path(__file__).parent.parent
         self.groq_api_key = os.getenv('GROQ_API_KEY')
         self.openai_api_key = os.getenv('OPENAI_API_KEY')
         
         # Initialize LLM
+        self.model_name = None
+        self._http = None
         self.llm = self._initialize_llm()
         
+        # README analyses cached on disk by content hash, so unchanged READMEs skip the LLM
+        self.llm_cache_enabled = llm_cache_enabled
+        self.llm_cache_ttl = llm_cache_ttl_days * 86400
+        self.llm_cache_dir = self.base_path / "llm_cache"
+        # Embedding index over cached analyses (cache key, language, vector), loaded on first use
+        self.semantic_index_path = self.llm_cache_dir / "semantic_index.jsonl"
+        self._semantic_index: Optional[List[Tuple[str, str, Any]]] = None
+        
+        # Serializes config-file rewrites between concurrently running configurations
+        self._config_lock = asyncio.Lock()
+        # Parsed config files and staged changes; batch runs write them once via flush_configs
+        self._py_servers: Optional[List[Dict]] = None
+        self._js_servers: Optional[List[Dict]] = None
+        self._py_content: Optional[str] = None
+        self._js_content: Optional[str] = None
+        self._py_dirty = False
+        self._js_dirty = False
+        self._defer_flush = False
+        
         # Configuration paths
         self.js_config_path = self.base_path / "src/Base/MCP_structure/mcp_servers/js/clients/src/client_and_server_config.ts"
         self.py_config_path = self.base_path / "src/Base/MCP_structure/mcp_servers/python/clients/src/client_and_server_config.py"
         self.servers_path = self.base_path / "src/Base/MCP_structure/mcp_servers"
+        # Server name -> README path from one directory glob; rebuilt by configure_all_mcps
+        self._readme_index: Optional[Dict[str, Path]] = None
+        
+        # Append-only configuration event log (JSON Lines)
+        self.config_log_path = self.base_path / "mcp_config_log.jsonl"
+        self._log_lock = threading.Lock()
+        self._log_compacted = False
         
         # Create backup directory
         self.backup_dir = self.base_path / "config_backups"
         self.backup_dir.mkdir(exist_ok=True)
         
+        # Parsed ServersConfig of both config files, reused across runs while a file's (mtime_ns, size) is unchanged
+        self.parsed_cache_path = self.backup_dir / ".parsed_cache.json"
+        self._parsed_snapshot: Optional[Dict[str, Dict[str, Any]]] = None
+        
     def _initialize_llm(self):
         """Initialize the language model (Groq preferred, OpenAI fallback)"""
         if not LANGCHAIN_AVAILABLE:
@@ -88,8 +371,10 @@ class MCPAutoConfigAgent:
                     groq_api_key=self.groq_api_key,
                     model_name="llama-3.1-8b-instant",
                     temperature=0.1,
-                    max_tokens=2048
+                    max_tokens=_README_MAX_TOKENS,
+                    **self._http_client_kwargs()
                 )
+                self.model_name = "llama-3.1-8b-instant"
                 logger.info("✅ Groq LLM initialized successfully")
                 return llm
             except Exception as e:
@@ -102,8 +387,10 @@ class MCPAutoConfigAgent:
                     openai_api_key=self.openai_api_key,
                     model_name="gpt-3.5-turbo",
                     temperature=0.1,
-                    max_tokens=2048
+                    max_tokens=_README_MAX_TOKENS,
+                    **self._http_client_kwargs()
                 )
+                self.model_name = "gpt-3.5-turbo"
                 logger.info("✅ OpenAI LLM initialized successfully")
                 return llm
             except Exception as e:
@@ -112,6 +399,31 @@ class MCPAutoConfigAgent:
         logger.error("❌ No valid API key found. Please set GROQ_API_KEY or OPENAI_API_KEY in .env file")
         return None
         
+    def _http_client_kwargs(self) -> Dict[str, Any]:
+        """LLM constructor kwargs for the agent's shared async connection pool (empty without httpx)"""
+        if not HTTPX_AVAILABLE:
+            return {}
+        if self._http is None:
+            # Concurrent analyses in configure_all_mcps reuse warm keep-alive connections instead of the SDK's small default pool
+            self._http = httpx.AsyncClient(
+                http2=_HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+                timeout=httpx.Timeout(30.0, connect=5.0)
+            )
+        return {"http_async_client": self._http}
+        
+    async def aclose(self):
+        """Close the shared HTTP connection pool"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+            
+    async def __aenter__(self):
+        return self
+        
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+        
     async def auto_configure_new_mcp(self, mcp_name: str, readme_path: str = None) -> bool:
         """Automatically configure a newly downloaded MCP server"""
         if not self.llm:
@@ -136,31 +448,49 @@ class MCPAutoConfigAgent:
             # Backup existing configurations
             await self._backup_configurations()
             
-            # Apply configuration
-            success = await self._apply_configuration(config)
-            
-            if success:
-                logger.info(f"✅ Successfully configured {mcp_name}")
-                await self._log_configuration_event(mcp_name, config, "SUCCESS")
-            else:
-                logger.error(f"❌ Failed to apply configuration for {mcp_name}")
-                await self._log_configuration_event(mcp_name, config, "FAILED")
-                
-            return success
+            return await self._apply_and_log(mcp_name, config)
             
         except Exception as e:
             logger.error(f"❌ Error auto-configuring {mcp_name}: {e}")
             await self._log_configuration_event(mcp_name, None, "ERROR", str(e))
             return False
             
+    async def _apply_and_log(self, mcp_name: str, config: MCPConfiguration) -> bool:
+        """Apply an extracted configuration and record the outcome in the configuration log"""
+        success = await self._apply_configuration(config)
+        
+        if success:
+            logger.info(f"✅ Successfully configured {mcp_name}")
+            await self._log_configuration_event(mcp_name, config, "SUCCESS")
+        else:
+            logger.error(f"❌ Failed to apply configuration for {mcp_name}")
+            await self._log_configuration_event(mcp_name, config, "FAILED")
+            
+        return success
+            
     async def _find_and_read_readme(self, mcp_name: str, readme_path: str = None) -> Optional[str]:
         """Find and read README file for MCP server"""
+        return await asyncio.to_thread(self._read_readme, mcp_name, readme_path)
+        
+    def _read_readme(self, mcp_name: str, readme_path: str = None) -> Optional[str]:
+        """Blocking half of _find_and_read_readme, run in a worker thread"""
         try:
             if readme_path and Path(readme_path).exists():
                 with open(readme_path, 'r', encoding='utf-8') as f:
                     return f.read()
                     
-            # Search in common locations
+            if self._readme_index is None:
+                self._readme_index = self._build_readme_index()
+            path = self._readme_index.get(mcp_name)
+            if path is not None:
+                try:
+                    logger.info(f"📖 Found README at: {path}")
+                    with open(path, 'r', encoding='utf-8') as f:
+                        return f.read()
+                except FileNotFoundError:
+                    pass  # removed since the index was built: probe below
+                    
+            # Not indexed (e.g. downloaded since the index was built): search in common locations
             search_paths = [
                 self.servers_path / "python" / "servers" / mcp_name / "README.md",
                 self.servers_path / "python" / "servers" / mcp_name / "readme.md",
@@ -182,139 +512,333 @@ class MCPAutoConfigAgent:
             logger.error(f"Error reading README for {mcp_name}: {e}")
             return None
             
+    def _build_readme_index(self) -> Dict[str, Path]:
+        """Map each server directory to its README with one glob, python before js and README.md before readme.md"""
+        candidates = [
+            path for path in self.servers_path.glob("*/servers/*/[Rr][Ee][Aa][Dd][Mm][Ee].md")
+            if path.parent.parent.parent.name in ("python", "js")
+        ]
+        index = {}
+        for path in sorted(candidates, key=lambda p: (p.parent.parent.parent.name != "python", p.name != "README.md")):
+            index.setdefault(path.parent.name, path)
+        return index
+        
     async def _analyze_readme_with_ai(self, mcp_name: str, readme_content: str) -> Optional[MCPConfiguration]:
         """Use AI to analyze README and extract configuration"""
+        cache_key = self._analysis_cache_key(mcp_name, readme_content)
+        cached = self._read_cached_analysis(cache_key)
+        if cached:
+            logger.info(f"⚡ Using cached README analysis for {mcp_name}")
+            return cached
+        embedding = None
+        if self._semantic_cache_enabled():
+            try:
+                embedding = await asyncio.to_thread(_embed_text, _extract_relevant_sections(readme_content))
+            except Exception as e:
+                logger.warning(f"README embedding failed, skipping the semantic cache: {e}")
+            else:
+                cached = self._semantic_cached_analysis(mcp_name, readme_content, embedding)
+                if cached:
+                    return cached
+        
         try:
-            system_prompt = """You are an expert at analyzing README files for MCP (Model Context Protocol) servers and extracting configuration information.
-
-Your task is to analyze a README file and extract the configuration needed to properly set up the MCP server.
-
-Extract and return ONLY a JSON object with these fields:
-- server_name: The name of the MCP server
-- command: The command to run the server (e.g., "python", "node", "uvx")
-- args: Array of command line arguments
-- env_vars: Object with required environment variables and their descriptions
-- install_method: How to install dependencies ("pip", "npm", "uvx", "manual")
-- dependencies: Array of required packages/dependencies
-- language: Programming language ("python", "javascript", "typescript")
-- build_required: Boolean if build step is needed
-- build_command: Build command if required
-- description: Brief description of what the server does
-- port: Port number if the server runs on a specific port (null if not specified)
-
-Guidelines:
-1. Look for installation instructions, usage examples, and configuration requirements
-2. Extract environment variables from code examples or documentation
-3. Identify the main command to run the server
-4. Note any build steps (npm run build, etc.)
-5. Parse dependencies from package.json, requirements.txt, pyproject.toml, etc.
-
-Example response:
-{
-  "server_name": "example-mcp",
-  "command": "python",
-  "args": ["main.py"],
-  "env_vars": {"API_KEY": "Your API key here"},
-  "install_method": "pip",
-  "dependencies": ["package1", "package2"],
-  "language": "python",
-  "build_required": false,
-  "build_command": null,
-  "description": "Example MCP server",
-  "port": null
-}
-
-Respond with ONLY the JSON object, no other text."""
-
             user_prompt = f"""Please analyze this README file for the MCP server "{mcp_name}" and extract configuration information:
 
 README Content:
-{readme_content}
+{_extract_relevant_sections(readme_content)}
 
 Extract the configuration as JSON."""
 
             messages = [
-                SystemMessage(content=system_prompt),
+                _system_message(_README_ANALYSIS_PROMPT),
                 HumanMessage(content=user_prompt)
             ]
             
-            response = await self.llm.ainvoke(messages)
-            response_text = response.content.strip()
-            
-            # Clean up response and extract JSON
-            if "```json" in response_text:
-                response_text = response_text.split("```json")[1].split("```")[0]
-            elif "```" in response_text:
-                response_text = response_text.split("```")[1].split("```")[0]
-                
-            # Parse JSON response
-            config_data = json.loads(response_text)
-            
-            # Create MCPConfiguration object
-            config = MCPConfiguration(
-                server_name=config_data.get('server_name', mcp_name),
-                command=config_data.get('command', 'python'),
-                args=config_data.get('args', []),
-                env_vars=config_data.get('env_vars', {}),
-                install_method=config_data.get('install_method', 'pip'),
-                dependencies=config_data.get('dependencies', []),
-                language=config_data.get('language', 'python'),
-                build_required=config_data.get('build_required', False),
-                build_command=config_data.get('build_command'),
-                description=config_data.get('description', ''),
-                port=config_data.get('port')
-            )
+            for attempt in range(_README_PARSE_RETRIES + 1):
+                response_text = await self._stream_json_reply(messages)
+                try:
+                    config_data = self._validate_config_data(_json_loads(response_text))
+                    break
+                except (json.JSONDecodeError, ValidationError) as e:
+                    if attempt == _README_PARSE_RETRIES:
+                        raise
+                    logger.warning(f"Malformed README analysis for {mcp_name} (attempt {attempt + 1}), retrying: {e}")
+                    # Show the model its own reply and the error, so the retry fixes rather than re-rolls it
+                    messages = messages + [
+                        AIMessage(content=response_text),
+                        HumanMessage(content=f"Your output had error: {e}. Fix and retry.")
+                    ]
+                    await asyncio.sleep(1.0 * (attempt + 1))
+                    
+            config = self._config_from_data(mcp_name, config_data)
             
             logger.info(f"✅ Successfully extracted configuration for {mcp_name}")
+            self._write_cached_analysis(cache_key, config)
+            if embedding is not None:
+                self._index_analysis(cache_key, config, embedding)
             return config
             
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse AI response as JSON: {e}")
+        except (json.JSONDecodeError, ValidationError) as e:
+            logger.error(f"Failed to parse AI response as a configuration: {e}")
             logger.debug(f"AI Response: {response_text}")
             return None
         except Exception as e:
             logger.error(f"Error analyzing README with AI: {e}")
             return None
             
+    async def _stream_json_reply(self, messages: List[Any], **invoke_kwargs) -> str:
+        """Stream a JSON-mode reply and stop reading as soon as its top-level JSON value closes"""
+        parts = []
+        scanner = _JsonCloseScanner()
+        async with aclosing(self.llm.astream(messages, **_JSON_REPLY_KWARGS, **invoke_kwargs)) as stream:
+            async for chunk in stream:
+                end = scanner.feed(chunk.content)
+                if end >= 0:
+                    parts.append(chunk.content[:end])
+                    break
+                parts.append(chunk.content)
+        reply = "".join(parts)
+        # Drop anything before the JSON, in case a provider without JSON mode still adds a preamble
+        match = _JSON_START.search(reply)
+        return reply[match.start():] if match else reply.strip()
+        
+    def _validate_config_data(self, data: Any) -> Dict[str, Any]:
+        """Check parsed JSON against MCPConfigSchema; nulls are dropped so _config_from_data applies its defaults"""
+        return MCPConfigSchema.model_validate(data).model_dump(exclude_none=True)
+        
+    def _config_from_data(self, mcp_name: str, config_data: Dict[str, Any]) -> MCPConfiguration:
+        """Build an MCPConfiguration from the model's JSON, with defaults for missing fields"""
+        # Categorical fields come from a handful of values: intern them (language/install_method lowercased)
+        return MCPConfiguration(
+            server_name=config_data.get('server_name', mcp_name),
+            command=sys.intern(str(config_data.get('command') or 'python')),
+            args=config_data.get('args', []),
+            env_vars=config_data.get('env_vars', {}),
+            install_method=sys.intern(str(config_data.get('install_method') or 'pip').lower()),
+            dependencies=config_data.get('dependencies', []),
+            language=sys.intern(str(config_data.get('language') or 'python').lower()),
+            build_required=config_data.get('build_required', False),
+            build_command=config_data.get('build_command'),
+            description=config_data.get('description', ''),
+            port=config_data.get('port')
+        )
+        
+    async def _analyze_readmes_batched(self, items: List[Tuple[str, str]]) -> Dict[str, Optional[MCPConfiguration]]:
+        """Analyze several (mcp_name, readme) pairs, sending the uncached ones to the LLM in concurrent batches"""
+        results = {}
+        pending = []
+        for mcp_name, readme_content in items:
+            cached = self._read_cached_analysis(self._analysis_cache_key(mcp_name, readme_content))
+            if cached:
+                logger.info(f"⚡ Using cached README analysis for {mcp_name}")
+                results[mcp_name] = cached
+            else:
+                pending.append((mcp_name, readme_content))
+                
+        # Forks and templated servers often ship byte-identical READMEs: analyze each text once
+        first_by_content: Dict[str, str] = {}
+        copies: Dict[str, List[str]] = defaultdict(list)
+        unique = []
+        for mcp_name, readme_content in pending:
+            first = first_by_content.setdefault(readme_content, mcp_name)
+            if first == mcp_name:
+                unique.append((mcp_name, readme_content))
+            else:
+                copies[first].append(mcp_name)
+        pending = unique
+        
+        embeddings = {}
+        vectors = None
+        if pending and self._semantic_cache_enabled():
+            try:
+                vectors = await asyncio.to_thread(
+                    _embed_text, [_extract_relevant_sections(content) for _, content in pending])
+            except Exception as e:
+                logger.warning(f"README embedding failed, skipping the semantic cache: {e}")
+        if vectors is not None:
+            misses = []
+            for (mcp_name, readme_content), embedding in zip(pending, vectors):
+                cached = self._semantic_cached_analysis(mcp_name, readme_content, embedding)
+                if cached:
+                    results[mcp_name] = cached
+                else:
+                    embeddings[mcp_name] = embedding
+                    misses.append((mcp_name, readme_content))
+            pending = misses
+            
+        semaphore = asyncio.Semaphore(_LLM_CONCURRENCY)
+        
+        async def analyze(batch: List[Tuple[str, str]]) -> Dict[str, Optional[MCPConfiguration]]:
+            async with semaphore:
+                return await self._analyze_readme_batch(batch)
+                
+        for batch_results in await asyncio.gather(*(analyze(batch) for batch in _chunk_readmes(pending))):
+            results.update(batch_results)
+        for mcp_name, readme_content in pending:
+            if results.get(mcp_name) and mcp_name in embeddings:
+                self._index_analysis(self._analysis_cache_key(mcp_name, readme_content),
+                                     results[mcp_name], embeddings[mcp_name])
+        
+        for readme_content, first in first_by_content.items():
+            config = results.get(first)
+            for mcp_name in copies.get(first, ()):
+                results[mcp_name] = replace(config, server_name=mcp_name) if config else None
+                if config:
+                    self._write_cached_analysis(self._analysis_cache_key(mcp_name, readme_content), results[mcp_name])
+        if copies:
+            logger.info(f"♻️  Reused analyses for {sum(map(len, copies.values()))} servers with duplicate READMEs")
+        return results
+        
+    async def _analyze_readme_batch(self, batch: List[Tuple[str, str]]) -> Dict[str, Optional[MCPConfiguration]]:
+        """Analyze one batch in a single LLM call, retrying and then falling back to one call per README"""
+        if len(batch) > 1:
+            for attempt in range(_README_BATCH_RETRIES + 1):
+                try:
+                    return await self._request_readme_batch(batch)
+                except Exception as e:
+                    logger.warning(f"Batched README analysis failed (attempt {attempt + 1}): {e}")
+                    if attempt < _README_BATCH_RETRIES:
+                        await asyncio.sleep(attempt + 1)
+                        
+        configs = await asyncio.gather(*(self._analyze_readme_with_ai(name, content) for name, content in batch))
+        return {name: config for (name, _), config in zip(batch, configs)}
+        
+    async def _request_readme_batch(self, batch: List[Tuple[str, str]]) -> Dict[str, MCPConfiguration]:
+        """Send one batch of READMEs to the LLM; raises ValueError unless every README gets a configuration"""
+        payload = [{"id": i, "mcp_name": name, "readme": _extract_relevant_sections(content)}
+                   for i, (name, content) in enumerate(batch)]
+        messages = [
+            _system_message(_README_BATCH_PROMPT),
+            HumanMessage(content=_json_dumps(payload))
+        ]
+        
+        data = _json_loads(await self._stream_json_reply(messages, max_tokens=_README_MAX_TOKENS * len(batch)))
+        if isinstance(data, dict):
+            data = data.get("configurations")
+        if not isinstance(data, list):
+            raise ValueError("expected a JSON object with a configurations array")
+        by_id = {int(item["id"]): item for item in data if isinstance(item, dict) and "id" in item}
+        
+        configs = {}
+        for i, (name, content) in enumerate(batch):
+            if i not in by_id:
+                raise ValueError(f"no configuration returned for {name}")
+            configs[name] = self._config_from_data(name, self._validate_config_data(by_id[i]))
+            self._write_cached_analysis(self._analysis_cache_key(name, content), configs[name])
+        logger.info(f"✅ Extracted {len(configs)} configurations in one request")
+        return configs
+        
+    def _analysis_cache_key(self, mcp_name: str, readme_content: str) -> str:
+        """Cache key for a README analysis: content, name, model and prompt hash"""
+        return _cache_key(readme_content, mcp_name, self.model_name or "", _README_PROMPT_HASH)
+        
+    def _read_cached_analysis(self, cache_key: str) -> Optional[MCPConfiguration]:
+        """Return the cached README analysis for this key, if present and not older than the TTL"""
+        if not self.llm_cache_enabled:
+            return None
+        try:
+            entry = _json_loads((self.llm_cache_dir / f"{cache_key}.json").read_bytes())
+            if time.time() - entry["timestamp"] > self.llm_cache_ttl:
+                return None
+            return self._config_from_data("", entry["config"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+            
+    def _write_cached_analysis(self, cache_key: str, config: MCPConfiguration):
+        """Store a README analysis atomically (temp file + rename), so readers never see a partial entry"""
+        if not self.llm_cache_enabled:
+            return
+        try:
+            self.llm_cache_dir.mkdir(exist_ok=True)
+            entry = {"config": asdict(config), "model": self.model_name, "timestamp": time.time()}
+            with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=self.llm_cache_dir,
+                                             suffix='.tmp', delete=False) as f:
+                f.write(_json_dumps(entry, indent=True))
+            os.replace(f.name, self.llm_cache_dir / f"{cache_key}.json")
+        except Exception as e:
+            logger.warning(f"Failed to cache README analysis: {e}")
+            
+    def _semantic_cache_enabled(self) -> bool:
+        """The semantic tier needs both the on-disk cache and sentence-transformers"""
+        return self.llm_cache_enabled and SEMANTIC_CACHE_AVAILABLE
+        
+    def _semantic_cached_analysis(self, mcp_name: str, readme_content: str, embedding: "np.ndarray") -> Optional[MCPConfiguration]:
+        """Reuse the analysis of a near-identical README (a fork or variant) whose language agrees with this one"""
+        language = _readme_language(readme_content)
+        candidates = [entry for entry in self._load_semantic_index()
+                      if language is None or _language_family(entry[1]) == language]
+        if not candidates:
+            return None
+            
+        # Embeddings are normalized, so one matrix-vector product gives every cosine similarity
+        scores = np.stack([entry[2] for entry in candidates]) @ embedding
+        best = int(np.argmax(scores))
+        if scores[best] < _SEMANTIC_CACHE_THRESHOLD:
+            return None
+        cached = self._read_cached_analysis(candidates[best][0])
+        if not cached:
+            return None
+        logger.info(f"⚡ Using README analysis of a near-identical server for {mcp_name} (similarity {scores[best]:.3f})")
+        return replace(cached, server_name=mcp_name)
+        
+    def _load_semantic_index(self) -> List[Tuple[str, str, Any]]:
+        """Read the embedding index once, keeping entries from the current model, prompts and embedded text"""
+        if self._semantic_index is None:
+            self._semantic_index = []
+            try:
+                with open(self.semantic_index_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        entry = _json_loads(line)
+                        if (entry["model"] == self.model_name and entry["prompt"] == _README_PROMPT_HASH
+                                and entry.get("text") == _SEMANTIC_INDEX_TEXT):
+                            self._semantic_index.append(
+                                (entry["key"], entry["language"], np.asarray(entry["embedding"], dtype=np.float32)))
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Ignoring unreadable semantic cache index: {e}")
+        return self._semantic_index
+        
+    def _index_analysis(self, cache_key: str, config: MCPConfiguration, embedding: "np.ndarray"):
+        """Add a freshly cached analysis to the embedding index (skipped if its key is already indexed)"""
+        index = self._load_semantic_index()
+        if any(entry[0] == cache_key for entry in index):
+            return
+        try:
+            self.llm_cache_dir.mkdir(exist_ok=True)
+            entry = {"key": cache_key, "language": config.language, "model": self.model_name,
+                     "prompt": _README_PROMPT_HASH, "text": _SEMANTIC_INDEX_TEXT,
+                     "embedding": embedding.tolist()}
+            with open(self.semantic_index_path, 'a', encoding='utf-8') as f:
+                f.write(_json_dumps(entry) + "\n")
+            index.append((cache_key, config.language, np.asarray(embedding, dtype=np.float32)))
+        except Exception as e:
+            logger.warning(f"Failed to index README analysis: {e}")
+            
     async def _apply_configuration(self, config: MCPConfiguration) -> bool:
         """Apply the extracted configuration to the appropriate config files"""
         try:
-            if config.language.lower() in ['python']:
-                return await self._update_python_config(config)
-            elif config.language.lower() in ['javascript', 'typescript']:
-                return await self._update_javascript_config(config)
-            else:
-                logger.warning(f"Unknown language {config.language}, trying Python config")
-                return await self._update_python_config(config)
+            async with self._config_lock:
+                if config.language == 'python':
+                    success = await self._update_python_config(config)
+                elif config.language in ('javascript', 'typescript'):
+                    success = await self._update_javascript_config(config)
+                else:
+                    logger.warning(f"Unknown language {config.language}, trying Python config")
+                    success = await self._update_python_config(config)
+                    
+                if success and not self._defer_flush:
+                    success = await self.flush_configs()
+                return success
                 
         except Exception as e:
             logger.error(f"Error applying configuration: {e}")
             return False
             
     async def _update_python_config(self, config: MCPConfiguration) -> bool:
-        """Update Python client configuration"""
+        """Stage a server entry in the Python client configuration (written by flush_configs)"""
         try:
-            if not self.py_config_path.exists():
-                logger.error(f"Python config file not found: {self.py_config_path}")
-                return False
-                
-            with open(self.py_config_path, 'r') as f:
-                content = f.read()
-                
-            # Parse existing configuration
-            lines = content.split('\n')
-            servers_config_start = -1
-            servers_config_end = -1
-            
-            for i, line in enumerate(lines):
-                if 'ServersConfig = [' in line:
-                    servers_config_start = i
-                elif servers_config_start != -1 and line.strip() == ']':
-                    servers_config_end = i
-                    break
-                    
-            if servers_config_start == -1:
-                logger.error("Could not find ServersConfig in Python config")
+            if not await asyncio.to_thread(self._load_python_servers):
                 return False
                 
             # Build new server configuration
@@ -326,38 +850,17 @@ Extract the configuration as JSON."""
             }
             
             # Check if server already exists
-            existing_servers = self._parse_existing_python_servers(content)
-            server_exists = any(s.get('server_name') == config.server_name for s in existing_servers)
-            
-            if server_exists:
+            if any(s.get('server_name') == config.server_name for s in self._py_servers):
                 logger.info(f"🔄 Updating existing server configuration for {config.server_name}")
                 # Remove existing configuration
-                existing_servers = [s for s in existing_servers if s.get('server_name') != config.server_name]
+                self._py_servers = [s for s in self._py_servers if s.get('server_name') != config.server_name]
             else:
                 logger.info(f"➕ Adding new server configuration for {config.server_name}")
                 
             # Add new configuration
-            existing_servers.append(server_config)
-            
-            # Rebuild ServersConfig section
-            new_servers_section = "ServersConfig = [\n"
-            for server in existing_servers:
-                new_servers_section += "    {\n"
-                new_servers_section += f'        "server_name": "{server["server_name"]}",\n'
-                new_servers_section += f'        "command": "{server["command"]}",\n'
-                new_servers_section += f'        "args": {json.dumps(server["args"])},\n'
-                new_servers_section += f'        "env": {json.dumps(server["env"])}\n'
-                new_servers_section += "    },\n"
-            new_servers_section += "]\n"
-            
-            # Replace the ServersConfig section
-            new_lines = lines[:servers_config_start] + new_servers_section.split('\n') + lines[servers_config_end+1:]
-            new_content = '\n'.join(new_lines)
-            
-            # Write updated configuration
-            with open(self.py_config_path, 'w') as f:
-                f.write(new_content)
-                
+            self._py_servers.append(server_config)
+            self._py_dirty = True
+            
             logger.info(f"✅ Updated Python configuration for {config.server_name}")
             return True
             
@@ -366,15 +869,11 @@ Extract the configuration as JSON."""
             return False
             
     async def _update_javascript_config(self, config: MCPConfiguration) -> bool:
-        """Update JavaScript/TypeScript client configuration"""
+        """Stage a server entry in the JavaScript/TypeScript client configuration (written by flush_configs)"""
         try:
-            if not self.js_config_path.exists():
-                logger.error(f"JavaScript config file not found: {self.js_config_path}")
+            if not await asyncio.to_thread(self._load_js_servers):
                 return False
                 
-            with open(self.js_config_path, 'r') as f:
-                content = f.read()
-                
             # Build new server configuration
             server_config = {
                 "server_name": config.server_name,
@@ -383,38 +882,16 @@ Extract the configuration as JSON."""
                 "server_features_and_capability": config.description or f"MCP Server for {config.server_name}"
             }
             
-            # Parse existing servers
-            existing_servers = self._parse_existing_js_servers(content)
-            server_exists = any(s.get('server_name') == config.server_name for s in existing_servers)
-            
-            if server_exists:
+            if any(s.get('server_name') == config.server_name for s in self._js_servers):
                 logger.info(f"🔄 Updating existing server configuration for {config.server_name}")
-                existing_servers = [s for s in existing_servers if s.get('server_name') != config.server_name]
+                self._js_servers = [s for s in self._js_servers if s.get('server_name') != config.server_name]
             else:
                 logger.info(f"➕ Adding new server configuration for {config.server_name}")
                 
             # Add new configuration
-            existing_servers.append(server_config)
-            
-            # Rebuild ServersConfig section
-            new_servers_section = "export const ServersConfig: any[] = [\n"
-            for server in existing_servers:
-                new_servers_section += "    {\n"
-                new_servers_section += f'        server_name: "{server["server_name"]}",\n'
-                new_servers_section += f'        command: "{server["command"]}",\n'
-                new_servers_section += f'        args: {json.dumps(server["args"])},\n'
-                new_servers_section += f'        server_features_and_capability: "{server["server_features_and_capability"]}"\n'
-                new_servers_section += "    },\n"
-            new_servers_section += "]\n"
-            
-            # Replace the ServersConfig section
-            pattern = r'export const ServersConfig: any\[\] = \[.*?\];'
-            new_content = re.sub(pattern, new_servers_section.strip(), content, flags=re.DOTALL)
-            
-            # Write updated configuration
-            with open(self.js_config_path, 'w') as f:
-                f.write(new_content)
-                
+            self._js_servers.append(server_config)
+            self._js_dirty = True
+            
             logger.info(f"✅ Updated JavaScript configuration for {config.server_name}")
             return True
             
@@ -422,14 +899,179 @@ Extract the configuration as JSON."""
             logger.error(f"Error updating JavaScript config: {e}")
             return False
             
+    def _load_python_servers(self) -> bool:
+        """Read and parse the Python config once per write cycle; False when it is missing or has no ServersConfig"""
+        if self._py_servers is not None:
+            return True
+        if not self.py_config_path.exists():
+            logger.error(f"Python config file not found: {self.py_config_path}")
+            return False
+            
+        content = self.py_config_path.read_text(encoding='utf-8')
+        if 'ServersConfig = [' not in content:
+            logger.error("Could not find ServersConfig in Python config")
+            return False
+            
+        self._py_content = content
+        self._py_servers = self._snapshot_servers("python", self.py_config_path,
+                                                  self._parse_existing_python_servers, content)
+        return True
+        
+    def _load_js_servers(self) -> bool:
+        """Read and parse the JavaScript config once per write cycle; False when it is missing"""
+        if self._js_servers is not None:
+            return True
+        if not self.js_config_path.exists():
+            logger.error(f"JavaScript config file not found: {self.js_config_path}")
+            return False
+            
+        self._js_content = self.js_config_path.read_text(encoding='utf-8')
+        self._js_servers = self._snapshot_servers("javascript", self.js_config_path,
+                                                  self._parse_existing_js_servers, self._js_content)
+        return True
+        
+    def _snapshot_servers(self, language: str, path: Path, parse: Callable[[str], List[Dict]],
+                          content: Optional[str] = None) -> List[Dict]:
+        """Servers of a config file from the parsed snapshot while its stamp matches; otherwise parse and record them"""
+        stamp = self._file_stamp(path)  # taken before reading, so a concurrent edit can only make the entry stale
+        entry = self._load_parsed_snapshot().get(language)
+        if entry and entry.get("stamp") == stamp:
+            return list(entry["servers"])
+            
+        if content is None:
+            content = path.read_text(encoding='utf-8')
+        servers = parse(content)
+        self._record_snapshot(language, stamp, servers)
+        return list(servers)
+        
+    def _file_stamp(self, path: Path) -> List[int]:
+        """(mtime_ns, size) of a config file, as stored in the parsed snapshot"""
+        st = path.stat()
+        return [st.st_mtime_ns, st.st_size]
+        
+    def _load_parsed_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Read the snapshot file once per agent"""
+        if self._parsed_snapshot is None:
+            try:
+                self._parsed_snapshot = _json_loads(self.parsed_cache_path.read_bytes())
+            except (OSError, ValueError):
+                self._parsed_snapshot = {}  # missing or unreadable: rebuilt as the files are parsed
+        return self._parsed_snapshot
+        
+    def _record_snapshot(self, language: str, stamp: List[int], servers: List[Dict]):
+        """Store one file's parsed servers under its stamp and persist the snapshot"""
+        snapshot = self._load_parsed_snapshot()
+        snapshot[language] = {"stamp": stamp, "servers": list(servers)}
+        try:
+            self._atomic_write(self.parsed_cache_path, _json_dumps(snapshot))
+        except OSError as e:
+            logger.warning(f"Failed to write parsed config snapshot: {e}")
+        
+    def _render_python_config(self) -> str:
+        """The Python config file with its ServersConfig section rebuilt from the staged servers"""
+        lines = self._py_content.split('\n')
+        servers_config_start = -1
+        servers_config_end = -1
+        
+        for i, line in enumerate(lines):
+            if 'ServersConfig = [' in line:
+                servers_config_start = i
+            elif servers_config_start != -1 and line.strip() == ']':
+                servers_config_end = i
+                break
+                
+        # Rebuild ServersConfig section
+        new_servers_section = "ServersConfig = [\n"
+        for server in self._py_servers:
+            new_servers_section += "    {\n"
+            new_servers_section += f'        "server_name": "{server["server_name"]}",\n'
+            new_servers_section += f'        "command": "{server["command"]}",\n'
+            new_servers_section += f'        "args": {_json_dumps(server["args"])},\n'
+            new_servers_section += f'        "env": {_json_dumps(server["env"])}\n'
+            new_servers_section += "    },\n"
+        new_servers_section += "]\n"
+        
+        # Replace the ServersConfig section
+        new_lines = lines[:servers_config_start] + new_servers_section.split('\n') + lines[servers_config_end+1:]
+        return '\n'.join(new_lines)
+        
+    def _render_js_config(self) -> str:
+        """The JavaScript config file with its ServersConfig section rebuilt from the staged servers"""
+        new_servers_section = "export const ServersConfig: any[] = [\n"
+        for server in self._js_servers:
+            new_servers_section += "    {\n"
+            new_servers_section += f'        server_name: "{server["server_name"]}",\n'
+            new_servers_section += f'        command: "{server["command"]}",\n'
+            new_servers_section += f'        args: {_json_dumps(server["args"])},\n'
+            new_servers_section += f'        server_features_and_capability: "{server["server_features_and_capability"]}"\n'
+            new_servers_section += "    },\n"
+        new_servers_section += "]\n"
+        
+        # Replace the ServersConfig section (a callable replacement, so backslashes are not template escapes)
+        section = new_servers_section.strip()
+        return _JS_SERVERS.sub(lambda match: section, self._js_content)
+        
+    async def flush_configs(self) -> bool:
+        """Write staged config changes, each file once and atomically, then drop the parsed copies"""
+        try:
+            if self._py_dirty:
+                await asyncio.to_thread(self._write_config, "python", self.py_config_path,
+                                        self._render_python_config(), self._py_servers)
+            if self._js_dirty:
+                await asyncio.to_thread(self._write_config, "javascript", self.js_config_path,
+                                        self._render_js_config(), self._js_servers)
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error writing configuration files: {e}")
+            return False
+            
+        finally:
+            # Re-read on the next update: other tools also edit these files
+            self._py_servers = self._js_servers = None
+            self._py_content = self._js_content = None
+            self._py_dirty = self._js_dirty = False
+            
+    def _write_config(self, language: str, path: Path, content: str, servers: List[Dict]):
+        """Write a rendered config file and snapshot the servers it now holds, so the next run skips the parse"""
+        self._atomic_write(path, content)
+        self._record_snapshot(language, self._file_stamp(path), servers)
+        
+    def _atomic_write(self, path: Path, content: str):
+        """Replace a file via a temp file in the same directory, so readers never see a partial write"""
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=path.parent, suffix='.tmp', delete=False) as f:
+            f.write(content)
+        os.replace(f.name, path)
+            
     def _parse_existing_python_servers(self, content: str) -> List[Dict]:
         """Parse existing Python server configurations"""
         try:
-            # Extract ServersConfig array content
-            start_pattern = r'ServersConfig\s*=\s*\['
-            end_pattern = r'\]'
+            tree = ast.parse(content, filename=str(self.py_config_path))
+            for node in tree.body:  # ServersConfig is a top-level assignment
+                if (isinstance(node, ast.Assign) and len(node.targets) == 1
+                        and isinstance(node.targets[0], ast.Name) and node.targets[0].id == "ServersConfig"):
+                    return [
+                        {
+                            "server_name": server["server_name"],
+                            "command": server.get("command", "python"),
+                            "args": server.get("args", []),
+                            "env": server.get("env", {})
+                        }
+                        for server in ast.literal_eval(node.value)
+                        if isinstance(server, dict) and "server_name" in server
+                    ]
+            return []
             
-            start_match = re.search(start_pattern, content)
+        except (SyntaxError, ValueError) as e:
+            # Half-written file, or JSON literals (true/null) that are not Python: fall back to scanning the text
+            logger.debug(f"Python config is not a plain literal module ({e}), scanning it instead")
+            return self._scan_python_servers(content)
+            
+    def _scan_python_servers(self, content: str) -> List[Dict]:
+        """Regex fallback for _parse_existing_python_servers"""
+        try:
+            # Extract ServersConfig array content
+            start_match = _PY_SERVERS_START.search(content)
             if not start_match:
                 return []
                 
@@ -451,24 +1093,23 @@ Extract the configuration as JSON."""
             array_content = content[start_pos:end_pos]
             
             # Use regex to find server configurations
-            server_pattern = r'\{[^}]*"server_name"[^}]*\}'
             servers = []
             
-            for match in re.finditer(server_pattern, array_content, re.DOTALL):
+            for match in _PY_SERVER_BLOCK.finditer(array_content):
                 server_text = match.group(0)
                 try:
                     # Extract individual fields
-                    name_match = re.search(r'"server_name":\s*"([^"]*)"', server_text)
-                    command_match = re.search(r'"command":\s*"([^"]*)"', server_text)
-                    args_match = re.search(r'"args":\s*(\[[^\]]*\])', server_text)
-                    env_match = re.search(r'"env":\s*(\{[^}]*\})', server_text)
+                    name_match = _PY_NAME.search(server_text)
+                    command_match = _PY_COMMAND.search(server_text)
+                    args_match = _PY_ARGS.search(server_text)
+                    env_match = _PY_ENV.search(server_text)
                     
                     if name_match:
                         server = {
                             "server_name": name_match.group(1),
                             "command": command_match.group(1) if command_match else "python",
-                            "args": json.loads(args_match.group(1)) if args_match else [],
-                            "env": json.loads(env_match.group(1)) if env_match else {}
+                            "args": _json_loads(args_match.group(1)) if args_match else [],
+                            "env": _json_loads(env_match.group(1)) if env_match else {}
                         }
                         servers.append(server)
                 except Exception as e:
@@ -485,8 +1126,7 @@ Extract the configuration as JSON."""
         """Parse existing JavaScript server configurations"""
         try:
             # Extract ServersConfig array content
-            pattern = r'export const ServersConfig: any\[\] = \[(.*?)\];'
-            match = re.search(pattern, content, re.DOTALL)
+            match = _JS_SERVERS.search(content)
             
             if not match:
                 return []
@@ -494,23 +1134,22 @@ Extract the configuration as JSON."""
             array_content = match.group(1)
             
             # Parse server objects
-            server_pattern = r'\{[^}]*server_name[^}]*\}'
             servers = []
             
-            for match in re.finditer(server_pattern, array_content, re.DOTALL):
+            for match in _JS_SERVER_BLOCK.finditer(array_content):
                 server_text = match.group(0)
                 try:
                     # Extract individual fields
-                    name_match = re.search(r'server_name:\s*"([^"]*)"', server_text)
-                    command_match = re.search(r'command:\s*"([^"]*)"', server_text)
-                    args_match = re.search(r'args:\s*(\[[^\]]*\])', server_text)
-                    desc_match = re.search(r'server_features_and_capability:\s*"([^"]*)"', server_text)
+                    name_match = _JS_NAME.search(server_text)
+                    command_match = _JS_COMMAND.search(server_text)
+                    args_match = _JS_ARGS.search(server_text)
+                    desc_match = _JS_DESCRIPTION.search(server_text)
                     
                     if name_match:
                         server = {
                             "server_name": name_match.group(1),
                             "command": command_match.group(1) if command_match else "node",
-                            "args": json.loads(args_match.group(1).replace("'", '"')) if args_match else [],
+                            "args": _json_loads(args_match.group(1).replace("'", '"')) if args_match else [],
                             "server_features_and_capability": desc_match.group(1) if desc_match else ""
                         }
                         servers.append(server)
@@ -528,27 +1167,27 @@ Extract the configuration as JSON."""
         """Backup existing configurations before making changes"""
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            
-            # Backup Python config
-            if self.py_config_path.exists():
-                backup_py = self.backup_dir / f"python_config_{timestamp}.py"
-                backup_py.write_text(self.py_config_path.read_text())
-                
-            # Backup JavaScript config
-            if self.js_config_path.exists():
-                backup_js = self.backup_dir / f"js_config_{timestamp}.ts"
-                backup_js.write_text(self.js_config_path.read_text())
-                
+            await asyncio.to_thread(self._write_backups, timestamp)
             logger.info(f"✅ Configuration backups created with timestamp: {timestamp}")
             
         except Exception as e:
             logger.warning(f"Failed to create configuration backups: {e}")
             
+    def _write_backups(self, timestamp: str):
+        """Copy both client configs into the backup directory byte for byte (sendfile on Linux; run in a worker thread)"""
+        # Backup Python config
+        if self.py_config_path.exists():
+            backup_py = self.backup_dir / f"python_config_{timestamp}.py"
+            shutil.copyfile(self.py_config_path, backup_py)
+            
+        # Backup JavaScript config
+        if self.js_config_path.exists():
+            backup_js = self.backup_dir / f"js_config_{timestamp}.ts"
+            shutil.copyfile(self.js_config_path, backup_js)
+            
     async def _log_configuration_event(self, mcp_name: str, config: Optional[MCPConfiguration], status: str, error: str = None):
         """Log configuration events for tracking and debugging"""
         try:
-            log_file = self.base_path / "mcp_config_log.json"
-            
             event = {
                 "timestamp": datetime.now().isoformat(),
                 "mcp_name": mcp_name,
@@ -562,28 +1201,42 @@ Extract the configuration as JSON."""
                 } if config else None
             }
             
-            # Read existing log
-            log_data = []
-            if log_file.exists():
-                try:
-                    with open(log_file, 'r') as f:
-                        log_data = json.load(f)
-                except:
-                    log_data = []
-                    
-            # Add new event
-            log_data.append(event)
-            
-            # Keep only last 100 events
-            log_data = log_data[-100:]
-            
-            # Write updated log
-            with open(log_file, 'w') as f:
-                json.dump(log_data, f, indent=2)
+            await asyncio.to_thread(self._append_log_event, event)
                 
         except Exception as e:
             logger.warning(f"Failed to log configuration event: {e}")
             
+    def _append_log_event(self, event: Dict[str, Any]):
+        """Append one event line; the agent's first write also trims the log to its last events"""
+        with self._log_lock:
+            if not self._log_compacted:
+                self._compact_configuration_log()
+                self._log_compacted = True
+            with open(self.config_log_path, 'a', encoding='utf-8') as f:
+                f.write(_json_dumps(event) + "\n")
+                
+    def _compact_configuration_log(self):
+        """Keep the last _CONFIG_LOG_MAX_EVENTS lines, importing the old JSON-array log if there is no JSONL yet"""
+        try:
+            if not self.config_log_path.exists():
+                legacy_log = self.base_path / "mcp_config_log.json"
+                if legacy_log.exists():
+                    events = _json_loads(legacy_log.read_bytes())[-_CONFIG_LOG_MAX_EVENTS:]
+                    self._atomic_write(self.config_log_path, "".join(_json_dumps(e) + "\n" for e in events))
+                return
+                
+            total = 0
+            with open(self.config_log_path, 'r', encoding='utf-8') as f:
+                lines = deque(maxlen=_CONFIG_LOG_MAX_EVENTS)
+                for line in f:
+                    total += 1
+                    lines.append(line)
+            if total > _CONFIG_LOG_MAX_EVENTS:
+                self._atomic_write(self.config_log_path, "".join(lines))
+                
+        except Exception as e:
+            logger.warning(f"Failed to compact configuration log: {e}")
+            
     async def configure_all_mcps(self) -> Dict[str, bool]:
         """Auto-configure all MCP servers found in the servers directory"""
         results = {}
@@ -605,21 +1258,60 @@ Extract the configuration as JSON."""
         all_servers = python_servers + js_servers
         
         logger.info(f"🔍 Found {len(all_servers)} MCP servers to configure")
+        self._readme_index = None  # pick up READMEs added since the last run
         
-        for server_name in all_servers:
-            try:
-                logger.info(f"🔧 Configuring {server_name}...")
-                success = await self.auto_configure_new_mcp(server_name)
-                results[server_name] = success
+        if not self.llm:
+            logger.error("❌ No LLM available for configuration")
+            return {server_name: False for server_name in all_servers}
+            
+        # Read every README first, so the analyses can share batched LLM calls
+        readmes = {}
+        contents = await asyncio.gather(*(self._find_and_read_readme(server_name) for server_name in all_servers))
+        for server_name, readme_content in zip(all_servers, contents):
+            if readme_content:
+                readmes[server_name] = readme_content
+            else:
+                logger.error(f"❌ No README found for {server_name}")
                 
-                if success:
-                    logger.info(f"✅ {server_name} configured successfully")
-                else:
-                    logger.error(f"❌ Failed to configure {server_name}")
+        configs = await self._analyze_readmes_batched(list(readmes.items()))
+        if any(configs.values()):
+            await self._backup_configurations()
+            
+        # Stage every configuration in memory, then write each config file once
+        applied = []
+        self._defer_flush = True
+        try:
+            for server_name in all_servers:
+                config = configs.get(server_name)
+                if not config:
+                    if server_name in readmes:
+                        logger.error(f"❌ Failed to extract configuration from README for {server_name}")
+                    results[server_name] = False
+                    continue
                     
-            except Exception as e:
-                logger.error(f"❌ Error configuring {server_name}: {e}")
-                results[server_name] = False
+                try:
+                    logger.info(f"🔧 Configuring {server_name}...")
+                    results[server_name] = await self._apply_configuration(config)
+                    applied.append((server_name, config))
+                        
+                except Exception as e:
+                    logger.error(f"❌ Error configuring {server_name}: {e}")
+                    await self._log_configuration_event(server_name, None, "ERROR", str(e))
+                    results[server_name] = False
+        finally:
+            self._defer_flush = False
+            async with self._config_lock:
+                flushed = await self.flush_configs()
+                
+        # Log outcomes only now that the files are written
+        for server_name, config in applied:
+            results[server_name] = results[server_name] and flushed
+            if results[server_name]:
+                logger.info(f"✅ Successfully configured {server_name}")
+                await self._log_configuration_event(server_name, config, "SUCCESS")
+            else:
+                logger.error(f"❌ Failed to apply configuration for {server_name}")
+                await self._log_configuration_event(server_name, config, "FAILED")
                 
         return results
         
@@ -635,9 +1327,8 @@ Extract the configuration as JSON."""
             
             # Validate Python configurations
             if self.py_config_path.exists():
-                with open(self.py_config_path, 'r') as f:
-                    py_content = f.read()
-                py_servers = self._parse_existing_python_servers(py_content)
+                py_servers = await asyncio.to_thread(self._snapshot_servers, "python", self.py_config_path,
+                                                     self._parse_existing_python_servers)
                 
                 for server in py_servers:
                     if mcp_name and server.get('server_name') != mcp_name:
@@ -655,9 +1346,8 @@ Extract the configuration as JSON."""
                         
             # Validate JavaScript configurations
             if self.js_config_path.exists():
-                with open(self.js_config_path, 'r') as f:
-                    js_content = f.read()
-                js_servers = self._parse_existing_js_servers(js_content)
+                js_servers = await asyncio.to_thread(self._snapshot_servers, "javascript", self.js_config_path,
+                                                     self._parse_existing_js_servers)
                 
                 for server in js_servers:
                     if mcp_name and server.get('server_name') != mcp_name:
@@ -694,8 +1384,11 @@ async def main():
     args = parser.parse_args()
     
     # Initialize agent
-    agent = MCPAutoConfigAgent(args.base_path)
-    
+    async with MCPAutoConfigAgent(args.base_path) as agent:
+        await _run_cli(agent, args)
+        
+async def _run_cli(agent: MCPAutoConfigAgent, args):
+    """Run the CLI action selected by args"""
     if not agent.llm:
         print("❌ No LLM available. Please set GROQ_API_KEY or OPENAI_API_KEY in environment")
         return
@@ -735,4 +1428,10 @@ async def main():
         print("Please specify --mcp-name, --configure-all, or --validate")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # uvloop (optional) is a faster drop-in event loop for these HTTP-heavy runs
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
@@ -130,4 +130,10 @@ async def main():
             print(f"  - {error}")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # uvloop (optional) is a faster drop-in event loop for these HTTP-heavy runs
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
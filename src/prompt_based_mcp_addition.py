@@ -8,9 +8,10 @@ import os
 import json
 import logging
 import re
+import time
 import aiohttp
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass, replace
 from pathlib import Path
 
 # Import existing components
@@ -26,10 +27,99 @@ try:
 except ImportError:
     GROQ_AVAILABLE = False
 
+# Use orjson for faster JSON (de)serialization when available
+try:
+    import orjson
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# GitHub search results per service name; repo search rankings are stable for minutes and
+# unauthenticated search is limited to 10 requests/minute
+_SEARCH_CACHE_MAXSIZE = 256
+_SEARCH_CACHE_TTL = 600.0  # seconds
+
+# Groq parses of add requests, keyed by normalized input (a parse depends only on the text)
+_PARSE_CACHE_MAXSIZE = 256
+
+_ADD_REQUEST_PROMPT = """You are an expert at understanding requests to add new MCP (Model Context Protocol) servers.
+
+Parse the user's request and respond with ONLY a JSON object with these fields:
+- name: the service/tool name (e.g., "leetcode", "docker", "email")
+- description: what the MCP server would do
+- language: likely programming language ("python", "typescript", or "unknown")
+- confidence: confidence score 0.0-1.0
+
+Examples:
+"add leetcode mcp server for coding practice" → {"name": "leetcode", "description": "LeetCode MCP server for coding practice and algorithm problems", "language": "python", "confidence": 0.95}
+"I need a docker mcp to manage containers" → {"name": "docker", "description": "Docker MCP server for container management", "language": "python", "confidence": 0.90}
+"add email integration mcp" → {"name": "email", "description": "Email MCP server for email integration", "language": "python", "confidence": 0.85}
+
+Respond with ONLY the JSON object, no other text."""
+
+# Parses below this confidence (or without a name) skip the GitHub search and go straight to
+# the manual-creation suggestion; the pattern parser reports 0.7
+_MIN_SEARCH_CONFIDENCE = 0.6
+# Service names the pattern parser can pick up from phrasing like "add a mcp server"
+_NON_SERVICE_NAMES = frozenset({"the", "a", "an"})
+
+# The JSON value in a Groq reply: the body of a markdown fence if there is one, else the outermost object/array
+_JSON_REPLY_RE = re.compile(r"```(?:json)?\s*([\[{].*?[\]}])\s*```|([\[{].*[\]}])", re.DOTALL)
+
+# parse_many: several requests per Groq call
+_ADD_REQUEST_BATCH_SUFFIX = """
+
+You may instead receive a JSON array of N requests. Then respond with ONLY a JSON array of N such objects, in the same order."""
+
+# Service-name extraction for add requests, tried in priority order (compiled once)
+_ADD_SERVICE_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r"add\s+(\w+)\s+mcp",
+    r"(\w+)\s+mcp\s+server",
+    r"need\s+(\w+)\s+mcp",
+    r"want\s+(\w+)\s+mcp",
+    r"install\s+(\w+)\s+mcp",
+    r"setup\s+(\w+)\s+mcp",
+    r"create\s+(\w+)\s+mcp"
+))
+
+# Command routing works on whitespace tokens: "add|create|install X mcp", "i need|want X mcp"
+_ADD_VERBS = frozenset({"add", "create", "install"})
+_NEED_VERBS = frozenset({"need", "want"})
+# ...unless it is a query: "what mcp servers", "list|show mcp", "check if X is", "status of"
+_QUERY_VERBS = frozenset({"list", "show"})
+
+def _is_add_command(tokens: List[str]) -> bool:
+    """True when the tokens contain an add-MCP phrase"""
+    for i, token in enumerate(tokens):
+        if token in _ADD_VERBS and i + 2 < len(tokens) and tokens[i + 2].startswith("mcp"):
+            return True
+        if (token == "i" and i + 3 < len(tokens) and tokens[i + 1] in _NEED_VERBS
+                and tokens[i + 3].startswith("mcp")):
+            return True
+    return False
+
+def _is_query_command(tokens: List[str]) -> bool:
+    """True when the tokens contain a status/listing phrase"""
+    for i in range(len(tokens) - 1):
+        token, following = tokens[i], tokens[i + 1]
+        if token in _QUERY_VERBS and following.startswith("mcp"):
+            return True
+        if token == "what" and following == "mcp" and i + 2 < len(tokens) and tokens[i + 2].startswith("servers"):
+            return True
+        if token == "check" and following == "if" and i + 3 < len(tokens) and tokens[i + 3].startswith("is"):
+            return True
+        if token == "status" and following == "of":
+            return True
+    return False
+
 @dataclass
 class MCPAddRequest:
     """Request to add a new MCP server via prompt"""
@@ -47,6 +137,11 @@ class DynamicMCPManager:
         self.base_path = Path(base_path)
         self.protocol = AIAgentProtocol(str(base_path))
         self.groq_api_key = groq_api_key
+        # GitHub searches share one connection pool (see _get_http_session)
+        self._http_session: Optional[aiohttp.ClientSession] = None
+        self._http_session_loop = None
+        self._search_cache: Dict[str, Tuple[float, List[Dict]]] = {}
+        self._parse_cache: Dict[str, MCPAddRequest] = {}
         
         # Initialize Groq if available
         if GROQ_AVAILABLE and groq_api_key and groq_api_key != "dummy_key":
@@ -80,6 +175,9 @@ class DynamicMCPManager:
             if not add_request:
                 return "❌ Could not understand MCP addition request\n💡 Try: 'add leetcode mcp server for coding practice'"
             
+            if not add_request.auto_detected and (len(add_request.name) == 1 or add_request.name in _NON_SERVICE_NAMES):
+                return await self._suggest_manual_creation(add_request)
+            
             # Search for the MCP server
             return await self._search_and_add_mcp(add_request)
             
@@ -89,24 +187,13 @@ class DynamicMCPManager:
     
     async def _parse_add_request_with_groq(self, user_input: str) -> Optional[MCPAddRequest]:
         """Parse add request using Groq LLM"""
+        cached = self._get_cached_parse(user_input)
+        if cached is not None:
+            return cached
+        
         try:
-            system_prompt = """You are an expert at understanding requests to add new MCP (Model Context Protocol) servers.
-
-Parse the user's request and respond with ONLY a JSON object with these fields:
-- name: the service/tool name (e.g., "leetcode", "docker", "email")
-- description: what the MCP server would do
-- language: likely programming language ("python", "typescript", or "unknown")
-- confidence: confidence score 0.0-1.0
-
-Examples:
-"add leetcode mcp server for coding practice" → {"name": "leetcode", "description": "LeetCode MCP server for coding practice and algorithm problems", "language": "python", "confidence": 0.95}
-"I need a docker mcp to manage containers" → {"name": "docker", "description": "Docker MCP server for container management", "language": "python", "confidence": 0.90}
-"add email integration mcp" → {"name": "email", "description": "Email MCP server for email integration", "language": "python", "confidence": 0.85}
-
-Respond with ONLY the JSON object, no other text."""
-
             messages = [
-                SystemMessage(content=system_prompt),
+                SystemMessage(content=_ADD_REQUEST_PROMPT),
                 HumanMessage(content=user_input)
             ]
             
@@ -115,21 +202,8 @@ Respond with ONLY the JSON object, no other text."""
             
             # Try to extract JSON from response
             try:
-                # Remove any markdown formatting
-                if "```json" in response_text:
-                    response_text = response_text.split("```json")[1].split("```")[0]
-                elif "```" in response_text:
-                    response_text = response_text.split("```")[1].split("```")[0]
-                
-                parsed = json.loads(response_text)
-                
-                return MCPAddRequest(
-                    description=user_input,
-                    name=parsed.get("name", ""),
-                    language=parsed.get("language", "unknown"),
-                    confidence=parsed.get("confidence", 0.5),
-                    auto_detected=True
-                )
+                parsed = self._load_json_reply(response_text)
+                return self._store_parse(user_input, parsed)
                 
             except json.JSONDecodeError:
                 logger.warning(f"Failed to parse Groq response as JSON: {response_text}")
@@ -139,6 +213,62 @@ Respond with ONLY the JSON object, no other text."""
             logger.error(f"Groq parsing failed: {e}")
             return self._parse_add_request_with_patterns(user_input)
     
+    async def parse_many(self, user_inputs: List[str]) -> List[Optional[MCPAddRequest]]:
+        """Parse several add requests, sending every uncached one to Groq in a single request"""
+        if self.mode != "groq":
+            return [self._parse_add_request_with_patterns(user_input) for user_input in user_inputs]
+        
+        pending = list(dict.fromkeys(user_input for user_input in user_inputs
+                                     if user_input.strip().lower() not in self._parse_cache))
+        if len(pending) > 1:
+            try:
+                messages = [
+                    SystemMessage(content=_ADD_REQUEST_PROMPT + _ADD_REQUEST_BATCH_SUFFIX),
+                    HumanMessage(content=_json_dumps(pending))
+                ]
+                response = await self.llm.ainvoke(messages)
+                parsed_list = self._load_json_reply(response.content.strip())
+                if not isinstance(parsed_list, list) or len(parsed_list) != len(pending):
+                    raise ValueError(f"expected a JSON array of {len(pending)} objects")
+                for user_input, parsed in zip(pending, parsed_list):
+                    self._store_parse(user_input, parsed)
+                logger.info(f"✅ Parsed {len(pending)} MCP add requests in one Groq request")
+            except Exception as e:
+                # Anything left uncached is parsed one by one below
+                logger.warning(f"Batched Groq parsing failed: {e}")
+        
+        return [await self._parse_add_request_with_groq(user_input) for user_input in user_inputs]
+    
+    def _load_json_reply(self, response_text: str) -> Any:
+        """Parse a JSON reply, removing any markdown formatting around it"""
+        match = _JSON_REPLY_RE.search(response_text)
+        return _json_loads(match.group(1) or match.group(2) if match else response_text)
+    
+    def _get_cached_parse(self, user_input: str) -> Optional[MCPAddRequest]:
+        """Return a copy of the cached Groq parse for this input, if any"""
+        normalized = user_input.strip().lower()
+        cached = self._parse_cache.pop(normalized, None)
+        if cached is None:
+            return None
+        self._parse_cache[normalized] = cached  # re-insert as most recently used
+        logger.info(f"⚡ Parse cache hit: {normalized}")
+        return replace(cached, description=user_input)
+    
+    def _store_parse(self, user_input: str, parsed: Dict[str, Any]) -> MCPAddRequest:
+        """Build an MCPAddRequest from Groq's JSON and cache it; returns a copy"""
+        add_request = MCPAddRequest(
+            description=user_input,
+            name=parsed.get("name", ""),
+            language=parsed.get("language", "unknown"),
+            confidence=parsed.get("confidence", 0.5),
+            auto_detected=True
+        )
+        
+        if len(self._parse_cache) >= _PARSE_CACHE_MAXSIZE:
+            del self._parse_cache[next(iter(self._parse_cache))]
+        self._parse_cache[user_input.strip().lower()] = add_request
+        return replace(add_request)
+    
     def _parse_add_request_with_patterns(self, user_input: str) -> Optional[MCPAddRequest]:
         """Parse add request using pattern matching"""
         user_input_lower = user_input.lower().strip()
@@ -149,19 +279,9 @@ Respond with ONLY the JSON object, no other text."""
         
         # Extract service name
         # Look for patterns like "add [service] mcp", "[service] mcp server", etc.
-        patterns = [
-            r"add\s+(\w+)\s+mcp",
-            r"(\w+)\s+mcp\s+server",
-            r"need\s+(\w+)\s+mcp",
-            r"want\s+(\w+)\s+mcp",
-            r"install\s+(\w+)\s+mcp",
-            r"setup\s+(\w+)\s+mcp",
-            r"create\s+(\w+)\s+mcp"
-        ]
-        
         service_name = ""
-        for pattern in patterns:
-            match = re.search(pattern, user_input_lower)
+        for pattern in _ADD_SERVICE_PATTERNS:
+            match = pattern.search(user_input_lower)
             if match:
                 service_name = match.group(1)
                 break
@@ -203,6 +323,10 @@ Respond with ONLY the JSON object, no other text."""
     
     async def _search_and_add_mcp(self, add_request: MCPAddRequest) -> str:
         """Search for and add the MCP server"""
+        if not add_request.name or add_request.confidence < _MIN_SEARCH_CONFIDENCE:
+            logger.info(f"🤔 Low-confidence parse ({add_request.confidence}), skipping GitHub search")
+            return await self._suggest_manual_creation(add_request)
+        
         try:
             service_name = add_request.name
             
@@ -214,21 +338,23 @@ Respond with ONLY the JSON object, no other text."""
                 return await self._suggest_manual_creation(add_request)
             
             # Show options to user
-            result = f"🔍 **Found {len(mcp_servers)} {service_name.title()} MCP servers:**\n\n"
+            parts = [f"🔍 **Found {len(mcp_servers)} {service_name.title()} MCP servers:**\n\n"]
             
             for i, server in enumerate(mcp_servers[:5], 1):
-                result += f"**{i}. {server['name']}**\n"
-                result += f"   📝 {server['description']}\n"
-                result += f"   ⭐ Stars: {server['stars']} | Language: {server['language']}\n"
-                result += f"   🔗 {server['url']}\n\n"
+                parts.append(
+                    f"**{i}. {server['name']}**\n"
+                    f"   📝 {server['description']}\n"
+                    f"   ⭐ Stars: {server['stars']} | Language: {server['language']}\n"
+                    f"   🔗 {server['url']}\n\n"
+                )
             
             # Auto-add the best match
             best_server = mcp_servers[0]
             auto_add_result = await self._auto_add_mcp_server(best_server, add_request)
             
-            result += f"🚀 **Auto-installing best match:**\n{auto_add_result}"
+            parts.append(f"🚀 **Auto-installing best match:**\n{auto_add_result}")
             
-            return result
+            return "".join(parts)
             
         except Exception as e:
             logger.error(f"Error searching and adding MCP: {e}")
@@ -236,58 +362,96 @@ Respond with ONLY the JSON object, no other text."""
     
     async def _search_github_for_mcp(self, service_name: str) -> List[Dict]:
         """Search GitHub for MCP servers"""
+        cache_key = service_name.lower()
+        now = time.monotonic()
+        hit = self._search_cache.pop(cache_key, None)
+        if hit is not None and now - hit[0] < _SEARCH_CACHE_TTL:
+            self._search_cache[cache_key] = hit  # re-insert as most recently used
+            logger.info(f"⚡ GitHub search cache hit: {service_name}")
+            return list(hit[1])
+        
         try:
-            async with aiohttp.ClientSession() as session:
-                # Search for repositories
-                search_queries = [
-                    f"{service_name} mcp server",
-                    f"{service_name}-mcp-server",
-                    f"mcp-{service_name}-server",
-                    f"{service_name} model context protocol"
-                ]
-                
-                all_results = []
-                
-                for query in search_queries:
-                    url = f"https://api.github.com/search/repositories?q={query}&sort=stars&order=desc"
-                    
-                    try:
-                        async with session.get(url) as response:
-                            if response.status == 200:
-                                data = await response.json()
-                                for repo in data.get('items', [])[:3]:
-                                    # Filter for likely MCP servers
-                                    repo_name = repo['name'].lower()
-                                    repo_desc = (repo['description'] or '').lower()
-                                    
-                                    if any(term in repo_name or term in repo_desc for term in ['mcp', 'model context protocol']):
-                                        server_info = {
-                                            'name': repo['name'],
-                                            'description': repo['description'] or f"{service_name.title()} MCP server",
-                                            'url': repo['html_url'],
-                                            'stars': repo['stargazers_count'],
-                                            'language': repo['language'] or 'unknown',
-                                            'default_branch': repo['default_branch']
-                                        }
-                                        all_results.append(server_info)
-                    except Exception as e:
-                        logger.warning(f"Error searching with query '{query}': {e}")
-                        continue
-                
-                # Remove duplicates and sort by stars
-                seen_urls = set()
-                unique_results = []
-                for result in all_results:
-                    if result['url'] not in seen_urls:
-                        seen_urls.add(result['url'])
-                        unique_results.append(result)
-                
-                return sorted(unique_results, key=lambda x: x['stars'], reverse=True)
+            session = await self._get_http_session()
+            # Search for repositories
+            search_queries = [
+                f"{service_name} mcp server",
+                f"{service_name}-mcp-server",
+                f"mcp-{service_name}-server",
+                f"{service_name} model context protocol"
+            ]
+            
+            async def fetch(query: str) -> List[Dict]:
+                url = f"https://api.github.com/search/repositories?q={query}&sort=stars&order=desc"
+                results = []
                 
+                try:
+                    async with session.get(url) as response:
+                        if response.status == 200:
+                            data = await response.json()
+                            for repo in data.get('items', [])[:3]:
+                                # Filter for likely MCP servers ("\n" keeps a term from spanning name and description)
+                                text = f"{repo['name']}\n{repo['description'] or ''}".lower()
+
+                                if 'mcp' in text or 'model context protocol' in text:
+                                    server_info = {
+                                        'name': repo['name'],
+                                        'description': repo['description'] or f"{service_name.title()} MCP server",
+                                        'url': repo['html_url'],
+                                        'stars': repo['stargazers_count'],
+                                        'language': repo['language'] or 'unknown',
+                                        'default_branch': repo['default_branch']
+                                    }
+                                    results.append(server_info)
+                except Exception as e:
+                    logger.warning(f"Error searching with query '{query}': {e}")
+                return results
+            
+            # The queries are independent round-trips: run them concurrently on the one session.
+            # Hits are deduplicated by URL (first occurrence wins) as they are collected
+            unique_results: Dict[str, Dict] = {}
+            for query_results in await asyncio.gather(*(fetch(query) for query in search_queries)):
+                for server_info in query_results:
+                    unique_results.setdefault(server_info['url'], server_info)
+
+            # Sort by stars
+            results = sorted(unique_results.values(), key=lambda x: x['stars'], reverse=True)
+            
+            # Empty results are not cached: they are often a rate-limited or failed search
+            if results:
+                if len(self._search_cache) >= _SEARCH_CACHE_MAXSIZE:
+                    del self._search_cache[next(iter(self._search_cache))]
+                self._search_cache[cache_key] = (now, results)
+            return list(results)
+            
         except Exception as e:
             logger.error(f"Error searching GitHub: {e}")
             return []
     
+    async def _get_http_session(self) -> aiohttp.ClientSession:
+        """Return the shared aiohttp session, (re)creating it if closed or bound to another event loop"""
+        loop = asyncio.get_running_loop()
+        if self._http_session is not None and not self._http_session.closed and self._http_session_loop is not loop:
+            # A session from an earlier event loop cannot be reused: close it rather than leak its connector
+            stale, self._http_session = self._http_session, None
+            try:
+                await stale.close()
+            except Exception as e:
+                # Transports of an already closed loop cannot be closed cleanly; drop them with the session
+                logger.debug(f"Could not close HTTP session from a previous event loop: {e}")
+                stale.detach()
+        if self._http_session is None or self._http_session.closed:
+            self._http_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300, keepalive_timeout=60)
+            )
+            self._http_session_loop = loop
+        return self._http_session
+    
+    async def close(self):
+        """Release the shared HTTP session"""
+        if self._http_session is not None and not self._http_session.closed:
+            await self._http_session.close()
+        self._http_session = None
+    
     async def _auto_add_mcp_server(self, server_info: Dict, add_request: MCPAddRequest) -> str:
         """Automatically add MCP server to registry"""
         try:
@@ -437,40 +601,44 @@ class EnhancedMCPCLIWithPromptAddition:
     def __init__(self, groq_api_key: str = None):
         self.base_path = Path(__file__).parent.parent
         self.dynamic_manager = DynamicMCPManager(str(self.base_path), groq_api_key)
+        # Handles every other command; imported and created on first use, then reused (see process_command)
+        self._fallback_cli: Optional["EnhancedMCPCLI"] = None
     
-    async def process_command(self, command: str) -> str:
-        """Process command with MCP addition support"""
-        command_lower = command.lower().strip()
+    def _is_add_mcp_request(self, command: str) -> bool:
+        """Whether a command should go to the dynamic MCP manager"""
+        tokens = command.lower().strip().split()
         
         # Check if it's specifically an add MCP request (more precise detection)
-        add_patterns = [
-            r"add\s+\w+\s+mcp",
-            r"create\s+\w+\s+mcp", 
-            r"install\s+\w+\s+mcp",
-            r"i\s+need\s+\w+\s+mcp",
-            r"i\s+want\s+\w+\s+mcp"
-        ]
-        
-        is_add_request = any(re.search(pattern, command_lower) for pattern in add_patterns)
+        is_add_request = _is_add_command(tokens)
         
         # Don't treat status/query commands as add requests
-        query_patterns = [
-            r"what\s+mcp\s+servers",
-            r"list\s+mcp",
-            r"show\s+mcp",
-            r"check\s+if\s+\w+\s+is",
-            r"status\s+of"
-        ]
-        
-        is_query_request = any(re.search(pattern, command_lower) for pattern in query_patterns)
+        is_query_request = _is_query_command(tokens)
         
-        if is_add_request and not is_query_request:
+        return is_add_request and not is_query_request
+    
+    async def prefetch_add_requests(self, commands: List[str]):
+        """Parse the add requests among commands in one batch, so processing them later hits the parse cache"""
+        add_commands = [command for command in commands if self._is_add_mcp_request(command)]
+        if add_commands:
+            await self.dynamic_manager.parse_many(add_commands)
+    
+    async def process_command(self, command: str) -> str:
+        """Process command with MCP addition support"""
+        if self._is_add_mcp_request(command):
             return await self.dynamic_manager.process_add_mcp_command(command)
         else:
             # Use original enhanced protocol
-            from enhanced_ai_protocol_working import EnhancedMCPCLI
-            original_cli = EnhancedMCPCLI()
-            return await original_cli.process_command(command)
+            if self._fallback_cli is None:
+                # Imported here so importing this module does not load the whole enhanced protocol
+                from enhanced_ai_protocol_working import EnhancedMCPCLI
+                self._fallback_cli = EnhancedMCPCLI()
+            return await self._fallback_cli.process_command(command)
+    
+    async def close(self):
+        """Release network resources held by the MCP manager and the fallback CLI"""
+        await self.dynamic_manager.close()
+        if self._fallback_cli is not None:
+            await self._fallback_cli.close()
 
 async def demo_prompt_based_mcp_addition():
     """Demo adding MCPs via prompts"""
@@ -496,19 +664,25 @@ async def demo_prompt_based_mcp_addition():
         print(f"  {i}. {cmd}")
     print()
     
-    for i, command in enumerate(demo_commands, 1):
-        print(f"\n🎯 **Command {i}/5:** '{command}'")
-        print("=" * 50)
-        
-        try:
-            response = await cli.process_command(command)
-            print("🤖 **AI Response:**")
-            print(response)
-        except Exception as e:
-            print(f"❌ Error: {e}")
+    try:
+        # One Groq request parses every add command up front
+        await cli.prefetch_add_requests(demo_commands)
         
-        print("=" * 50)
-        await asyncio.sleep(1)
+        for i, command in enumerate(demo_commands, 1):
+            print(f"\n🎯 **Command {i}/5:** '{command}'")
+            print("=" * 50)
+            
+            try:
+                response = await cli.process_command(command)
+                print("🤖 **AI Response:**")
+                print(response)
+            except Exception as e:
+                print(f"❌ Error: {e}")
+            
+            print("=" * 50)
+            await asyncio.sleep(1)
+    finally:
+        await cli.close()
     
     print("\n🎉 **Demo Complete!**")
     print("\n✨ **Key Features:**")
@@ -523,4 +697,10 @@ async def demo_prompt_based_mcp_addition():
     print("  • 'create twitter mcp for social media'")
 
 if __name__ == "__main__":
-    asyncio.run(demo_prompt_based_mcp_addition())
+    # uvloop (optional) is a faster drop-in event loop for these HTTP-heavy runs
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(demo_prompt_based_mcp_addition())
+    else:
+        uvloop.run(demo_prompt_based_mcp_addition())